@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+
+# Django 3.2 не умеет выполнять запросы к БД асинхронно, а синхронные
+# представления под ASGI выполняются по очереди в одном потоке.
+# Асинхронные представления отдают работу с БД этому пулу, поэтому
+# одновременно к БД обращается не больше ASYNC_DB_WORKERS потоков,
+# а ожидающие и медленные соединения обслуживает цикл событий.
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_WORKERS, thread_name_prefix='api-db'
+)
+
+
+def _call_view(view, request, args, kwargs):
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """
+    Асинхронный вариант представления: само представление вместе
+    с отрисовкой ответа выполняется в пуле `DB_EXECUTOR`.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            DB_EXECUTOR, context.run, _call_view, view, request, args, kwargs
+        )
+    return wrapper
+
+
+def async_urlpatterns(patterns, names):
+    """Заменяет представления маршрутов `names` асинхронными."""
+    return [
+        URLPattern(
+            pattern.pattern, async_view(pattern.callback),
+            pattern.default_args, pattern.name
+        )
+        if isinstance(pattern, URLPattern) and pattern.name in names
+        else pattern
+        for pattern in patterns
+    ]
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    ASGI-обработчик, читающий потоковые ответы в потоке синхронного кода.
+
+    Django 3.2 перебирает `StreamingHttpResponse` прямо в цикле событий,
+    и генератор с запросами к БД падает с SynchronousOnlyOperation.
+    Здесь каждая часть ответа берётся через `sync_to_async` в том же
+    потоке, где выполнялось представление и где ответ будет закрыт.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = [
+            (
+                header.encode('ascii') if isinstance(header, str) else header,
+                value.encode('latin1') if isinstance(value, str) else value,
+            )
+            for header, value in response.items()
+        ]
+        headers.extend(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        try:
+            while (part := await next_part(parts, None)) is not None:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
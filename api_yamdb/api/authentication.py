@@ -0,0 +1,167 @@
+from time import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.constants import (
+    AUTH_USER_CACHE_TIMEOUT, ROLE_REVOCATIONS_CACHE_TIMEOUT
+)
+from users.models import RoleRevocation
+
+
+User = get_user_model()
+
+CACHED_USER_FIELDS = (
+    'id', 'username', 'role', 'is_staff', 'is_superuser', 'is_active'
+)
+ROLE_CLAIMS = ('role', 'is_staff', 'is_superuser')
+ROLE_REVOCATIONS_KEY = 'role-revocations'
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def make_access_token(user):
+    """
+    Токен доступа пользователя. При настройке `TOKEN_ROLE_CLAIMS`
+    в него добавляются роль и флаги администратора.
+    """
+    token = AccessToken.for_user(user)
+    if settings.TOKEN_ROLE_CLAIMS:
+        token['username'] = user.username
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+    return token
+
+
+def revoke_role_claims(user_id):
+    """Запрещает доверять ролям из ранее выданных токенов."""
+    now = timezone.now()
+    RoleRevocation.objects.filter(
+        revoked_at__lt=now - api_settings.ACCESS_TOKEN_LIFETIME
+    ).delete()
+    RoleRevocation.objects.create(user_id=user_id)
+    cache.delete(ROLE_REVOCATIONS_KEY)
+
+
+def get_role_revocations():
+    """Время последней смены роли по пользователям, в секундах."""
+    revocations = cache.get(ROLE_REVOCATIONS_KEY)
+    if revocations is None:
+        revocations = {}
+        for user_id, revoked_at in RoleRevocation.objects.filter(
+            revoked_at__gte=timezone.now() - api_settings.ACCESS_TOKEN_LIFETIME
+        ).values_list('user_id', 'revoked_at'):
+            revocations[user_id] = max(
+                revocations.get(user_id, 0), revoked_at.timestamp()
+            )
+        cache.set(
+            ROLE_REVOCATIONS_KEY, revocations, ROLE_REVOCATIONS_CACHE_TIMEOUT
+        )
+    return revocations
+
+
+def build_user(fields):
+    """
+    Пользователь только с переданными полями,
+    остальные загружаются из БД при обращении к ним.
+    """
+    # from_db ждёт значения в порядке полей модели.
+    field_names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in fields
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS,
+        field_names,
+        [fields[name] for name in field_names]
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без чтения пользователя из БД.
+    Роль берётся из токена, если он выдан после последней смены роли,
+    иначе данные пользователя берутся из кеша.
+
+    Сигналы очищают кеш только в своём процессе, поэтому данные из кеша,
+    сохранённые раньше последней смены роли по RoleRevocation, загружаются
+    заново: другие процессы видят смену не позже чем через
+    ROLE_REVOCATIONS_CACHE_TIMEOUT.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        revoked_at = get_role_revocations().get(user_id)
+        if self.has_trusted_claims(revoked_at, validated_token):
+            return build_user({
+                'id': user_id,
+                'username': validated_token['username'],
+                'is_active': True,
+                **{claim: validated_token[claim] for claim in ROLE_CLAIMS}
+            })
+
+        state = cache.get(user_cache_key(user_id))
+        if state is None or (
+            revoked_at is not None and state['cached_at'] <= revoked_at
+        ):
+            # Время берётся до чтения из БД: смена роли во время чтения
+            # окажется позже него.
+            cached_at = time()
+            user = super().get_user(validated_token)
+            cache.set(
+                user_cache_key(user_id),
+                {
+                    'fields': {
+                        field: getattr(user, field)
+                        for field in CACHED_USER_FIELDS
+                    },
+                    'password': get_md5_hash_password(user.password),
+                    'cached_at': cached_at,
+                },
+                AUTH_USER_CACHE_TIMEOUT
+            )
+            return user
+
+        user = build_user(state['fields'])
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != state['password']:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code='password_changed'
+            )
+        return user
+
+    def has_trusted_claims(self, revoked_at, validated_token):
+        if not settings.TOKEN_ROLE_CLAIMS or any(
+            claim not in validated_token
+            for claim in ROLE_CLAIMS + ('username',)
+        ):
+            return False
+        return revoked_at is None or validated_token['iat'] > revoked_at
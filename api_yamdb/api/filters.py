@@ -1,13 +1,26 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
     genre = django_filters.CharFilter(field_name='genre__slug')
     category = django_filters.CharFilter(field_name='category__slug')
     name = django_filters.CharFilter(lookup_expr='icontains')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('genre', 'category', 'year', 'name')
+        fields = ('genre', 'category', 'year', 'name', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class ExportFilter(django_filters.FilterSet):
+    """Фильтры выгрузки отзывов и комментариев."""
+
+    title = django_filters.NumberFilter(field_name='title_id')
+    category = django_filters.CharFilter(field_name='title__category__slug')
+    pub_date = django_filters.DateFromToRangeFilter()
@@ -0,0 +1,55 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+SYNC_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу данных SQLite в файлы реплик '
+        'из настройки DATABASE_REPLICAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а повторять копирование.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=SYNC_INTERVAL,
+            help='Пауза в секундах между копированиями.'
+        )
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Копирование реплик поддерживается только для SQLite.'
+            )
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('В настройке DATABASE_REPLICAS нет реплик.')
+        while True:
+            primary.ensure_connection()
+            for alias in settings.DATABASE_REPLICAS:
+                # Резервное копирование SQLite атомарно для читателей реплики.
+                replica = sqlite3.connect(
+                    connections[alias].settings_dict['NAME']
+                )
+                try:
+                    primary.connection.backup(replica)
+                finally:
+                    replica.close()
+            self.stdout.write(
+                f'Реплики обновлены: {", ".join(settings.DATABASE_REPLICAS)}'
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
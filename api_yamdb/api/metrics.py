@@ -0,0 +1,125 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _Shard:
+    """Счётчики одного потока, изменяются только этим потоком."""
+
+    def __init__(self):
+        # Последние две ячейки гистограммы: сумма и количество.
+        self.latency = defaultdict(
+            lambda: [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0]
+        )
+        self.responses = defaultdict(int)
+        self.in_flight = defaultdict(int)
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик запросов с отдельными счётчиками на каждый поток.
+    Блокировка берётся только при появлении нового потока,
+    данные потоков объединяются при чтении метрик.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def request_started(self, view):
+        self._shard().in_flight[view] += 1
+
+    def request_finished(self, view, status, duration):
+        shard = self._shard()
+        shard.in_flight[view] -= 1
+        shard.responses[view, status] += 1
+        histogram = shard.latency[view]
+        histogram[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        histogram[-2] += duration
+        histogram[-1] += 1
+
+    def collect(self):
+        """Возвращает объединённые по потокам значения."""
+        latency = {}
+        responses = defaultdict(int)
+        in_flight = defaultdict(int)
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for view, histogram in shard.latency.copy().items():
+                total = latency.setdefault(view, [0] * len(histogram))
+                for idx, value in enumerate(list(histogram)):
+                    total[idx] += value
+            for key, value in shard.responses.copy().items():
+                responses[key] += value
+            for view, value in shard.in_flight.copy().items():
+                in_flight[view] += value
+        return latency, responses, in_flight
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        latency, responses, in_flight = self.collect()
+        lines = [
+            '# HELP api_request_duration_seconds Request latency by view.',
+            '# TYPE api_request_duration_seconds histogram',
+        ]
+        for view, histogram in sorted(latency.items()):
+            cumulative = 0
+            bounds = [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']
+            for bound, value in zip(bounds, histogram):
+                cumulative += value
+                lines.append(
+                    'api_request_duration_seconds_bucket'
+                    f'{{view="{view}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'api_request_duration_seconds_sum{{view="{view}"}} '
+                f'{histogram[-2]}'
+            )
+            lines.append(
+                f'api_request_duration_seconds_count{{view="{view}"}} '
+                f'{histogram[-1]}'
+            )
+        lines += [
+            '# HELP api_responses_total Responses by view and status code.',
+            '# TYPE api_responses_total counter',
+        ]
+        for (view, status), value in sorted(responses.items()):
+            lines.append(
+                f'api_responses_total{{view="{view}",status="{status}"}} '
+                f'{value}'
+            )
+        lines += [
+            '# HELP api_requests_in_flight Requests being processed.',
+            '# TYPE api_requests_in_flight gauge',
+        ]
+        for view, value in sorted(in_flight.items()):
+            lines.append(f'api_requests_in_flight{{view="{view}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def view_label(view_func, method):
+    """Имя вида `TitleViewSet.list` для вьюсетов DRF и APIView."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f'{view_class.__name__}.{action}'
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.routers import read_from_replicas
+
+from .metrics import registry, view_label
+
+
+logger = logging.getLogger('api.queries')
+
+# Статистика запросов текущего HTTP-запроса. Контекст копируется
+# в потоки sync_to_async и пула асинхронных представлений, поэтому
+# запросы к БД учитываются в любом потоке.
+query_stats = ContextVar('query_stats', default=None)
+
+
+class QueryStats:
+    """Обёртка `execute_wrapper`, считающая запросы и время в БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if duration >= self.slowest:
+                self.slowest = duration
+                self.slowest_sql = sql
+
+
+def record_query(execute, sql, params, many, context):
+    stats = query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def instrument_connection(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument_connection(connection)
+
+
+class AsyncCapableMiddleware:
+    """
+    Основа middleware, которое под ASGI работает в цикле событий,
+    не занимая поток на всё время запроса.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так же переключается django.utils.deprecation.MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class QueryInstrumentationMiddleware(AsyncCapableMiddleware):
+    """
+    Добавляет в ответ заголовок `Server-Timing` с количеством
+    и временем SQL-запросов и пишет их в лог `api.queries`.
+    Включается настройкой `QUERY_INSTRUMENTATION`.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        # Соединения, открытые до загрузки middleware.
+        for connection in connections.all():
+            instrument_connection(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = query_stats.set(QueryStats())
+        try:
+            response = self.get_response(request)
+            return self.finish(request, response, query_stats.get())
+        finally:
+            query_stats.reset(token)
+
+    async def __acall__(self, request):
+        token = query_stats.set(QueryStats())
+        try:
+            response = await self.get_response(request)
+            return self.finish(request, response, query_stats.get())
+        finally:
+            query_stats.reset(token)
+
+    def finish(self, request, response, stats):
+        match = request.resolver_match
+        url_name = match.url_name if match else None
+        response['Server-Timing'] = (
+            f'db;dur={stats.duration * 1000:.2f};'
+            f'desc="{stats.count} queries", '
+            f'db-slowest;dur={stats.slowest * 1000:.2f}'
+        )
+        logger.info(
+            'url_name=%s method=%s status=%s queries=%d db_ms=%.2f '
+            'slowest_ms=%.2f slowest_sql=%r',
+            url_name, request.method, response.status_code, stats.count,
+            stats.duration * 1000, stats.slowest * 1000, stats.slowest_sql,
+            extra={
+                'url_name': url_name,
+                'queries': stats.count,
+                'db_ms': stats.duration * 1000,
+                'slowest_ms': stats.slowest * 1000,
+                'slowest_sql': stats.slowest_sql,
+            }
+        )
+        return response
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Собирает задержку, коды ответов и число выполняющихся запросов
+    по каждому действию вьюсета. Отключается настройкой `METRICS`.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        if self.is_async:
+            # Иначе Django выполнит process_view в синхронном потоке.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = perf_counter()
+        response = self.get_response(request)
+        self.finish(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        response = await self.get_response(request)
+        self.finish(request, response, started)
+        return response
+
+    def finish(self, request, response, started):
+        view = getattr(request, 'metrics_view', None)
+        if view is not None:
+            registry.request_finished(
+                view, response.status_code, perf_counter() - started
+            )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'skip_metrics', False):
+            return None
+        request.metrics_view = view_label(view_func, request.method)
+        registry.request_started(request.metrics_view)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        return MetricsMiddleware.process_view(
+            self, request, view_func, view_args, view_kwargs
+        )
+
+
+class ReplicaPinMiddleware(AsyncCapableMiddleware):
+    """
+    Запросы на запись и запросы клиента, недавно изменявшего данные,
+    читают из основной базы данных, остальные — из одной реплики
+    на весь запрос.
+    Отключается, если в настройке `DATABASE_REPLICAS` нет реплик.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with read_from_replicas(self.replicas_allowed(request)):
+            response = self.get_response(request)
+        return self.pin_writer(request, response)
+
+    async def __acall__(self, request):
+        with read_from_replicas(self.replicas_allowed(request)):
+            response = await self.get_response(request)
+        return self.pin_writer(request, response)
+
+    def replicas_allowed(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+
+    def pin_writer(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
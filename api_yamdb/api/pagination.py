@@ -0,0 +1,167 @@
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+
+
+PAGINATION_MODE_PARAM = 'pagination'
+CURSOR_MODE = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+MAX_PAGE_SIZE = 1000
+
+
+def is_cursor_requested(request):
+    """
+    Курсорный режим включается параметром `?pagination=cursor`
+    или заголовком `Accept: application/json; pagination=cursor`.
+    """
+    if request.query_params.get(PAGINATION_MODE_PARAM) == CURSOR_MODE:
+        return True
+    media_type = getattr(request, 'accepted_media_type', None) or ''
+    params = (param.replace(' ', '') for param in media_type.split(';')[1:])
+    return f'{PAGINATION_MODE_PARAM}={CURSOR_MODE}' in params
+
+
+class CountedPaginator(Paginator):
+    """Использует уже посчитанное `precomputed_count` вместо COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        count = getattr(self.object_list, 'precomputed_count', None)
+        if count is None:
+            return super().count
+        return count
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    django_paginator_class = CountedPaginator
+
+
+class SizedPageNumberPagination(PageNumberPagination):
+    """Постраничная пагинация с размером страницы из `?page_size`."""
+
+    page_size_query_param = PAGE_SIZE_PARAM
+    max_page_size = MAX_PAGE_SIZE
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по паре (`pub_date`, `id`) без COUNT и OFFSET.
+    Курсор хранит дату и id крайней записи страницы, поэтому записи
+    с одинаковой датой публикации не переводят выборку на OFFSET,
+    как позиция по одному полю в `CursorPagination`.
+    """
+
+    ordering = ('pub_date', 'id')
+    page_size_query_param = PAGE_SIZE_PARAM
+    max_page_size = MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            pub_date, pk = instance['pub_date'], instance['id']
+        else:
+            pub_date, pk = instance.pub_date, instance.id
+        return f'{pub_date.isoformat()},{pk}'
+
+    def parse_position(self, position):
+        pub_date, _, pk = position.rpartition(',')
+        try:
+            pub_date, pk = parse_datetime(pub_date), int(pk)
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        # Смещение из курсора не используется: позиция всегда уникальна.
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, (
+                self.cursor.position
+            )
+
+        if reverse:
+            queryset = queryset.order_by('-pub_date', '-id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            pub_date, pk = self.parse_position(current_position)
+            lookup = 'lt' if reverse else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'pub_date__{lookup}': pub_date})
+                | Q(pub_date=pub_date, **{f'id__{lookup}': pk})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            following_position = None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """
+    Постраничная пагинация по умолчанию
+    с курсорным режимом по запросу клиента.
+    """
+
+    page_number_class = SizedPageNumberPagination
+    cursor_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.paginator = self.page_number_class()
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if is_cursor_requested(request):
+            self.paginator = self.cursor_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_links(self):
+        return (
+            self.paginator.get_next_link(),
+            self.paginator.get_previous_link()
+        )
+
+    def to_html(self):
+        return self.paginator.to_html()
@@ -22,7 +22,7 @@ class IsAuthorOrAdministration(permissions.IsAuthenticatedOrReadOnly):
     def has_object_permission(self, request, view, obj):
         if request.user.is_authenticated:
             return (
-                request.user == obj.author
+                request.user.pk == obj.author_id
                 or request.user.is_admin
                 or request.user.is_staff
                 or request.user.is_moderator
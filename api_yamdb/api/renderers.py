@@ -0,0 +1,59 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Рендерер потоковой выгрузки: `stream` отдаёт строки, которые
+    подкласс выводит в `lines(columns, rows)`, блоками по `block_size`
+    символов, а `render` выводит ошибки строкой JSON.
+    """
+
+    charset = 'utf-8'
+    block_size = 64 * 1024
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False) + '\n'
+
+    def stream(self, columns, rows):
+        block = []
+        size = 0
+        for line in self.lines(columns, rows):
+            block.append(line)
+            size += len(line)
+            if size >= self.block_size:
+                yield ''.join(block)
+                block = []
+                size = 0
+        if block:
+            yield ''.join(block)
+
+
+class JSONLinesRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+
+    def lines(self, columns, rows):
+        for row in rows:
+            row = dict(zip(columns, row))
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Файл для `csv.writer`, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def lines(self, columns, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
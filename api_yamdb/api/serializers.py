@@ -1,14 +1,19 @@
+from operator import attrgetter
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
-from api_yamdb.settings import EMAIL_FROM
+from reviews.constants import (
+    LEADERBOARD_DEFAULT_LIMIT, LEADERBOARD_MAX_LIMIT
+)
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rating_from_counters
 from users.constants import (
     MAX_CHARFIELD_LENGTH, MAX_EMAIL_LENGTH, USER_ROLES
 )
+from users.outbox import enqueue_email
 from users.validators import validate_forbidden_username
 
 
@@ -49,12 +54,10 @@ class UserRegistrationSerializer(serializers.Serializer):
             email=validated_data['email']
         )
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        enqueue_email(
             subject='Код подтверждения',
             message=f'Ваш код подтверждения: {confirmation_code}',
-            from_email=EMAIL_FROM,
-            recipient_list=[user.email],
-            fail_silently=False,
+            recipient=user.email,
         )
         return user
 
@@ -116,23 +119,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         exclude = ('title',)
 
-    def validate(self, data):
-        request = self.context['request']
-        title_id = request.parser_context.get('kwargs').get('title_id')
-
-        if (
-            request.method == "POST"
-            and Review.objects.filter(
-                author=request.user,
-                title=title_id
-            ).exists()
-        ):
-            raise serializers.ValidationError(
-                'Запрещено добавлять больше одного отзыва на одно произведение'
-            )
-
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -185,10 +171,63 @@ class TitleSerializer(serializers.ModelSerializer):
             'description',
         )
 
+    def create(self, validated_data):
+        self.saved_genres = validated_data['genre']
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        # Жанры из prefetch_related: UpdateModelMixin сбросит его после
+        # сохранения, и ответ прочитал бы их заново.
+        if 'genre' in validated_data:
+            self.saved_genres = validated_data['genre']
+        else:
+            self.saved_genres = list(instance.genre.all())
+        return super().update(instance, validated_data)
+
     def to_representation(self, instance):
-        super().to_representation(instance)
-        title_list_serializer = TitleListSerializer(instance)
-        return title_list_serializer.data
+        """
+        Ответ на запись в формате `TitleListSerializer` из сохранённого
+        объекта: категория и жанры берутся из проверенных данных или уже
+        загруженных связей, рейтинг — из счётчиков произведения.
+        """
+        genres = getattr(self, 'saved_genres', None)
+        if genres is None:
+            genres = instance.genre.all()
+        category = instance.category
+        return represent_title(
+            instance.pk, instance.name, instance.year, instance.description,
+            instance.rating,
+            None if category is None else (category.name, category.slug),
+            [
+                {'name': genre.name, 'slug': genre.slug}
+                for genre in sort_genres(
+                    {genre.pk: genre for genre in genres}.values()
+                )
+            ]
+        )
+
+
+class TopTitlesParamsSerializer(serializers.Serializer):
+    """Параметры запроса лучших произведений."""
+
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=LEADERBOARD_MAX_LIMIT,
+        default=LEADERBOARD_DEFAULT_LIMIT
+    )
+    min_reviews = serializers.IntegerField(min_value=1, default=1)
+
+
+class TitleStatsSerializer(serializers.Serializer):
+    """Распределение оценок произведения."""
+
+    histogram = serializers.DictField(child=serializers.IntegerField())
+    count = serializers.IntegerField()
+    mean = serializers.FloatField(allow_null=True)
+    median = serializers.FloatField(allow_null=True)
+    stddev = serializers.FloatField(allow_null=True)
 
 
 class TitleListSerializer(serializers.ModelSerializer):
@@ -196,7 +235,7 @@ class TitleListSerializer(serializers.ModelSerializer):
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = serializers.IntegerField(default=None)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -204,3 +243,93 @@ class TitleListSerializer(serializers.ModelSerializer):
             'name', 'genre', 'category', 'year',
             'description', 'id', 'rating'
         )
+
+
+TITLE_ROW_FIELDS = (
+    'pk', 'name', 'year', 'description', 'rating_sum', 'rating_count',
+    'category__name', 'category__slug', 'updated_at'
+)
+
+
+def title_rows(queryset):
+    """Строки произведений для `TitleRowSerializer` вместо объектов."""
+    return queryset.prefetch_related(None).values_list(
+        *TITLE_ROW_FIELDS, named=True
+    )
+
+
+def sort_genres(genres):
+    """Жанры в порядке Genre.Meta.ordering, как при чтении из БД."""
+    genres = list(genres)
+    for field in reversed(Genre._meta.ordering):
+        genres.sort(
+            key=attrgetter(field.lstrip('-')), reverse=field.startswith('-')
+        )
+    return genres
+
+
+def genres_by_title(title_ids):
+    """Жанры произведений одним запросом, в порядке модели Genre."""
+    genres = {title_id: [] for title_id in title_ids}
+    links = (
+        Title.genre.through.objects.filter(title_id__in=genres)
+        .order_by(*(
+            f'genre__{field}' for field in Genre._meta.ordering
+        ))
+        .values_list('title_id', 'genre__name', 'genre__slug')
+    )
+    for title_id, name, slug in links:
+        genres[title_id].append({'name': name, 'slug': slug})
+    return genres
+
+
+def represent_title(pk, name, year, description, rating, category, genres):
+    """
+    Произведение в формате `TitleListSerializer`: `category` —
+    пара (название, слаг) или None, `genres` — список словарей.
+    """
+    return {
+        'name': name,
+        'genre': genres,
+        'category': None if category is None else {
+            'name': category[0],
+            'slug': category[1],
+        },
+        'year': year,
+        'description': description,
+        'id': pk,
+        'rating': None if rating is None else int(rating),
+    }
+
+
+class TitleRowListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        rows = list(data)
+        genres = genres_by_title([row.pk for row in rows])
+        return [
+            self.child.represent(row, genres[row.pk]) for row in rows
+        ]
+
+
+class TitleRowSerializer(serializers.BaseSerializer):
+    """
+    Вывод произведения только для чтения из строки `title_rows`:
+    словарь собирается напрямую, без полей и вложенных сериализаторов.
+    JSON совпадает с `TitleListSerializer`.
+    """
+
+    class Meta:
+        list_serializer_class = TitleRowListSerializer
+
+    def to_representation(self, row):
+        return self.represent(row, genres_by_title([row.pk])[row.pk])
+
+    def represent(self, row, genres):
+        return represent_title(
+            row.pk, row.name, row.year, row.description,
+            rating_from_counters(row.rating_sum, row.rating_count),
+            None if row.category__slug is None
+            else (row.category__name, row.category__slug),
+            genres
+        )
@@ -1,15 +1,20 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
+from .async_views import async_urlpatterns
 from .views import (
     CategoryViewSet,
+    CommentExportView,
     CommentsViewSet,
     GenreViewSet,
+    ReviewExportView,
     ReviewsViewSet,
     SignUp,
     TokenObtainView,
     TitleViewSet,
-    UserForAdminViewSet
+    UserForAdminViewSet,
+    metrics
 )
 
 v1_router = routers.DefaultRouter()
@@ -28,12 +33,31 @@ v1_router.register(
     basename='comments'
 )
 
+# Частые запросы на чтение, которые под ASGI обслуживаются асинхронно.
+ASYNC_URL_NAMES = ('title-list', 'title-detail', 'reviews-list',
+                   'comments-list')
+
+v1_urls = v1_router.urls
+if settings.ASYNC_VIEWS:
+    v1_urls = async_urlpatterns(v1_urls, ASYNC_URL_NAMES)
+
 urlpatterns = [
+    path('metrics/', metrics, name='metrics'),
     path('v1/auth/signup/', SignUp.as_view(), name='signup'),
     path(
         'v1/auth/token/',
         TokenObtainView.as_view(),
         name='token_obtain'
     ),
-    path('v1/', include(v1_router.urls)),
+    path(
+        'v1/export/reviews/',
+        ReviewExportView.as_view(),
+        name='export-reviews'
+    ),
+    path(
+        'v1/export/comments/',
+        CommentExportView.as_view(),
+        name='export-comments'
+    ),
+    path('v1/', include(v1_urls)),
 ]
@@ -1,21 +1,31 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import DateTimeField
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
-from .filters import TitleFilter
+from .authentication import make_access_token
+from .filters import ExportFilter, TitleFilter
+from .metrics import registry
+from .pagination import PageNumberOrCursorPagination
 from .permissions import (
     IsAdminOnly,
     IsAdminOrReadOnly,
     IsAuthorOrAdministration,
 )
+from .renderers import CSVRenderer, JSONLinesRenderer
 from reviews.models import (
     Category,
+    Comment,
     Genre,
     Review,
     Title
@@ -25,19 +35,44 @@ from .serializers import (
     CommentSerializer,
     GenreSerializer,
     ReviewSerializer,
+    TitleRowSerializer,
     TitleSerializer,
-    TitleListSerializer,
+    TitleStatsSerializer,
+    TopTitlesParamsSerializer,
     UserConfirmationSerializer,
     UserForAdminSerializer,
     UserRegistrationSerializer,
-    UserSerializer
+    UserSerializer,
+    title_rows
 )
-from reviews.mixins import CategoryGenreMixin
+from reviews.constants import MAX_SCORE, MIN_SCORE
+from reviews.mixins import CategoryGenreMixin, ConditionalGetMixin
+from reviews.ratings import get_score_histogram, score_statistics, top_titles
 from .viewsets import ListCreateDestroyViewSet
 
 
 User = get_user_model()
 
+EXPORT_CHUNK_SIZE = 2000
+
+
+def metrics(request):
+    """
+    Метрики запросов в текстовом формате Prometheus,
+    только для адресов из `METRICS_ALLOWED_IPS`.
+    """
+    if not settings.METRICS:
+        raise Http404
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise PermissionDenied
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+metrics.skip_metrics = True
+
 
 class SignUp(APIView):
     """
@@ -64,7 +99,7 @@ class TokenObtainView(APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
         user = get_object_or_404(User, username=username)
-        access_token = AccessToken.for_user(user)
+        access_token = make_access_token(user)
         return Response(
             {'token': str(access_token)},
             status=status.HTTP_200_OK
@@ -91,7 +126,8 @@ class UserForAdminViewSet(viewsets.ModelViewSet):
         methods=['get', 'patch']
     )
     def me(self, request):
-        user = request.user
+        # request.user из кеша аутентификации содержит не все поля.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             serializer = UserSerializer(user)
             return Response(serializer.data)
@@ -101,56 +137,62 @@ class UserForAdminViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    pagination_class = PageNumberOrCursorPagination
     serializer_class = ReviewSerializer
     http_method_names = ('get', 'post', 'patch', 'delete')
     permission_classes = (IsAuthorOrAdministration,)
 
     def get_title(self):
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(
-            Title,
-            pk=title_id
-        )
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title,
+                pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(
-            author=self.request.user,
-            title=title,
-        )
-
-
-class CommentsViewSet(viewsets.ModelViewSet):
+        try:
+            serializer.save(
+                author=self.request.user,
+                title=self.get_title(),
+            )
+        except IntegrityError:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Запрещено добавлять больше одного отзыва '
+                    'на одно произведение'
+                ]
+            })
+
+
+class CommentsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    pagination_class = PageNumberOrCursorPagination
     serializer_class = CommentSerializer
     http_method_names = ('get', 'post', 'patch', 'delete')
     permission_classes = (IsAuthorOrAdministration,)
 
     def get_review(self):
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(
-            Review,
-            pk=review_id,
-            title=title_id,
-        )
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(
-            Title,
-            pk=title_id,
-        )
+        review = self.get_review()
         serializer.save(
             author=self.request.user,
-            title=title,
-            review=self.get_review(),
+            title=review.title,
+            review=review,
         )
 
 
@@ -164,10 +206,10 @@ class GenreViewSet(CategoryGenreMixin, ListCreateDestroyViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by(*Title._meta.ordering)
+class TitleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (IsAdminOrReadOnly,)
@@ -175,6 +217,95 @@ class TitleViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
-            return TitleListSerializer
+        if self.action in ('list', 'retrieve', 'top'):
+            return TitleRowSerializer
         return TitleSerializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ('list', 'retrieve'):
+            # Строки после фильтров: поиск добавляет соединение с индексом
+            # и сортировку по релевантности.
+            return title_rows(queryset)
+        return queryset
+
+    @action(detail=False, filter_backends=())
+    def top(self, request):
+        """
+        Лучшие произведения по байесовскому рейтингу
+        с фильтрами по жанру и категории.
+        """
+        params = TopTitlesParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        titles = top_titles(
+            title_rows(self.get_queryset()), **params.validated_data
+        )
+        return Response(self.get_serializer(titles, many=True).data)
+
+    @action(detail=True, filter_backends=())
+    def stats(self, request, pk=None):
+        """Гистограмма и статистика оценок произведения."""
+        title = get_object_or_404(Title.objects.only('pk'), pk=pk)
+        counts = get_score_histogram(title.pk).counts
+        stats = score_statistics(counts)
+        stats['histogram'] = dict(
+            zip(range(MIN_SCORE, MAX_SCORE + 1), counts)
+        )
+        return Response(TitleStatsSerializer(stats).data)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка всех записей в JSON Lines или CSV
+    (`?format=jsonl` или `?format=csv`) для администратора.
+    Записи читаются из БД пакетами, поэтому расход памяти
+    не зависит от объёма выгрузки.
+    """
+
+    permission_classes = (IsAdminOnly,)
+    renderer_classes = (JSONLinesRenderer, CSVRenderer)
+    queryset = None
+    filename = None
+    # Колонки выгрузки и соответствующие им поля, последняя — дата.
+    columns = ()
+    fields = ()
+
+    def get(self, request):
+        filterset = ExportFilter(
+            request.query_params, queryset=self.queryset.order_by('id')
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(self.columns, self.rows(filterset.qs)),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.filename}.{renderer.format}"'
+        )
+        return response
+
+    def rows(self, queryset):
+        pub_date = DateTimeField().to_representation
+        rows = queryset.values_list(*self.fields).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        )
+        for *values, date in rows:
+            yield (*values, pub_date(date))
+
+
+class ReviewExportView(ExportView):
+    queryset = Review.objects.all()
+    filename = 'reviews'
+    columns = ('id', 'title', 'author', 'score', 'text', 'pub_date')
+    fields = ('id', 'title_id', 'author__username', 'score', 'text',
+              'pub_date')
+
+
+class CommentExportView(ExportView):
+    queryset = Comment.objects.all()
+    filename = 'comments'
+    columns = ('id', 'title', 'review', 'author', 'text', 'pub_date')
+    fields = ('id', 'title_id', 'review_id', 'author__username', 'text',
+              'pub_date')
@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+
+from django.conf import settings
+
+
+_replica = ContextVar('replica', default=None)
+_replica_counter = count()
+
+
+@contextmanager
+def read_from_replicas(allowed=True):
+    """
+    Внутри блока чтение идёт из одной реплики, выбранной по кругу
+    при входе: все запросы блока видят одну точку репликации.
+    Вне его, в том числе в миграциях и командах, все запросы идут
+    в основную базу данных.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    replica = None
+    if allowed and replicas:
+        replica = replicas[next(_replica_counter) % len(replicas)]
+    token = _replica.set(replica)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Чтение внутри `read_from_replicas` идёт из реплики блока,
+    остальные запросы идут в `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат копию тех же данных.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема попадает в реплики вместе с данными.
+        return db not in settings.DATABASE_REPLICAS
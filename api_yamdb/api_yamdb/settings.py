@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -31,6 +32,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryInstrumentationMiddleware',
+    'api.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +75,61 @@ DATABASES = {
     }
 }
 
+# Профиль базы данных: 'default' или 'sqlite-performance'
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'default')
+
+# PRAGMA, выполняемые при открытии соединения с SQLite (api_yamdb/db.py).
+# Журнал WAL позволяет читать во время записи, а synchronous=NORMAL
+# в режиме WAL при сбое питания теряет только последние транзакции.
+SQLITE_PERFORMANCE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRAGMAS = {}
+
+if DATABASE_PROFILE == 'sqlite-performance':
+    SQLITE_PRAGMAS = SQLITE_PERFORMANCE_PRAGMAS
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+
+# Реплики только для чтения (api_yamdb/routers.py). Локально каждая
+# реплика — копия файла основной базы данных, которую обновляет
+# команда sync_replicas.
+DATABASE_REPLICAS = []
+for number in range(1, int(os.environ.get('DATABASE_REPLICAS', 0)) + 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api_yamdb.routers.ReplicaRouter']
+
+# После записи клиент читает из основной базы данных, пока не истечёт
+# cookie: время должно превышать отставание реплик.
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 10
+
+
+# Cache
+
+# Кеш списков и пользователей: при нескольких процессах нужен общий
+# кеш, например CACHE_BACKEND=django.core.cache.backends.memcached.
+# PyMemcacheCache и CACHE_LOCATION=127.0.0.1:11211.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
 
 # Password validation
 
@@ -120,10 +179,10 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -131,6 +190,43 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=3),
 }
 
+# Роль и флаги администратора в токене доступа: права проверяются
+# без обращения к БД до смены роли пользователя
+TOKEN_ROLE_CLAIMS = False
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FROM = 'yamdb@localhost'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Асинхронные представления для частых запросов на чтение (api/urls.py).
+# Включаются в asgi.py: под WSGI каждый вызов создавал бы цикл событий.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+# Число потоков, через которые асинхронные представления работают с БД
+ASYNC_DB_WORKERS = int(os.environ.get('ASYNC_DB_WORKERS', 8))
+
+# Метрики запросов по действиям вьюсетов на /api/metrics/,
+# доступны только с адресов METRICS_ALLOWED_IPS
+METRICS = os.environ.get('METRICS') == '1'
+METRICS_ALLOWED_IPS = os.environ.get(
+    'METRICS_ALLOWED_IPS', '127.0.0.1'
+).split(',')
+
+# Количество и время SQL-запросов в заголовке Server-Timing и в логе
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.queries': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
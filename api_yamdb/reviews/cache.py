@@ -0,0 +1,58 @@
+import json
+from hashlib import md5
+from time import time_ns
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import quote_etag
+
+from .constants import LIST_CACHE_TIMEOUT
+
+
+def _version_key(model):
+    return f'list-version:{model._meta.label_lower}'
+
+
+def get_list_version(model):
+    """
+    Текущая версия списка объектов модели, без обращения к БД.
+    В кеше своего процесса версию меняют только свои записи, поэтому
+    ETag берётся не из версии, а из закешированного ответа.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Версия, вытесненная из кеша, не должна совпасть с прежними.
+        cache.add(key, time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_list_version(model):
+    """Делает недействительными все закешированные страницы списка."""
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.add(_version_key(model), time_ns(), timeout=None)
+
+
+def list_cache_key(model, version, *parts):
+    digest = md5(':'.join((str(version),) + parts).encode()).hexdigest()
+    return f'list:{model._meta.label_lower}:{digest}'
+
+
+def cache_list(key, data, media_type):
+    """
+    Сохраняет ответ вместе с ETag по его содержимому: после истечения
+    кеша процесс, не заметивший чужой записи, отдаст новые данные
+    с новым ETag, а не 304 по старой версии.
+    """
+    etag = quote_etag(md5(
+        json.dumps((media_type, data), cls=DjangoJSONEncoder).encode()
+    ).hexdigest())
+    cache.set(key, (etag, data), LIST_CACHE_TIMEOUT)
+    return etag, data
+
+
+def get_cached_list(key):
+    return cache.get(key)
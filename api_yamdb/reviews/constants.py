@@ -3,3 +3,10 @@ MAX_LENGTH_MAIN = 256
 MAX_LENGTH_SLUG = 50
 MAX_SCORE = 10
 MIN_SCORE = 1
+# Время жизни закешированных списков категорий и жанров, секунды
+LIST_CACHE_TIMEOUT = 300
+# Вес априорной средней оценки в байесовском рейтинге: столько
+# «средних» отзывов добавляется к отзывам каждого произведения
+LEADERBOARD_PRIOR_WEIGHT = 5
+LEADERBOARD_DEFAULT_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
@@ -0,0 +1,195 @@
+"""
+Генерация синтетических отзывов и комментариев для нагрузочных тестов.
+
+Случайные значения произведения зависят только от зерна и номера
+произведения в запуске, поэтому данные не зависят от деления на части
+и от уже имеющихся в базе id.
+
+Модуль не зависит от Django, чтобы его можно было выполнять
+в отдельных процессах, пишущих в собственные файлы SQLite.
+"""
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from math import gcd
+
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'актёр', 'режиссёр',
+    'музыка', 'сцена', 'диалог', 'история', 'персонаж', 'автор', 'глава',
+    'отличный', 'скучный', 'неожиданный', 'затянутый', 'смешной',
+    'грустный', 'красивый', 'слабый', 'сильный', 'честный', 'странный',
+    'очень', 'совсем', 'немного', 'слишком', 'всегда', 'никогда', 'снова',
+    'понравился', 'разочаровал', 'удивил', 'запомнился', 'рекомендую',
+    'пересмотрю', 'перечитаю', 'советую', 'не', 'и', 'но', 'а', 'это',
+)
+TEXT_POOL_SIZE = 1024
+DATE_RANGE = timedelta(days=5 * 365)
+REVIEW_COLUMNS = (
+    'id', 'author_id', 'title_id', 'text', 'score', 'pub_date', 'updated_at'
+)
+COMMENT_COLUMNS = (
+    'id', 'author_id', 'review_id', 'title_id', 'text', 'pub_date',
+    'updated_at'
+)
+
+
+def text_pool(seed):
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choices(WORDS, k=rng.randint(5, 40))).capitalize()
+        for _ in range(TEXT_POOL_SIZE)
+    ]
+
+
+def zipf_counts(items, total, exponent, cap, seed):
+    """
+    Распределяет `total` записей по `items` объектам по закону Zipf:
+    объект на месте r по популярности получает долю, пропорциональную
+    1 / r ** exponent, но не больше `cap`. Места выбираются случайно.
+    """
+    ranks = list(range(1, items + 1))
+    random.Random(seed).shuffle(ranks)
+    weights = [rank ** -exponent for rank in ranks]
+    counts = [0] * items
+    free = list(range(items))
+    remaining = min(total, cap * items)
+    while remaining and free:
+        weight = sum(weights[idx] for idx in free)
+        share = remaining / weight
+        capped = []
+        for idx in free:
+            extra = min(int(weights[idx] * share), cap - counts[idx])
+            counts[idx] += extra
+            remaining -= extra
+            if counts[idx] == cap:
+                capped.append(idx)
+        if not capped:
+            # Остаток от округления достаётся самым популярным.
+            for idx in sorted(free, key=lambda idx: -weights[idx]):
+                if not remaining:
+                    break
+                counts[idx] += 1
+                remaining -= 1
+            break
+        capped = set(capped)
+        free = [idx for idx in free if idx not in capped]
+    return counts
+
+
+def proportional_counts(weights, total):
+    """Делит `total` пропорционально весам методом наибольших остатков."""
+    weight = sum(weights)
+    if not weight:
+        return [0] * len(weights)
+    counts = [item * total // weight for item in weights]
+    order = sorted(
+        range(len(weights)),
+        key=lambda idx: -(weights[idx] * total % weight)
+    )
+    for idx in order[:total - sum(counts)]:
+        counts[idx] += 1
+    return counts
+
+
+def _date(rng, now):
+    return str(now - DATE_RANGE * rng.random())
+
+
+def review_rows(spec):
+    """Отзывы пачки произведений: разные авторы у одного произведения."""
+    texts = text_pool(spec['seed'])
+    users, user_base = spec['users'], spec['first_user_id']
+    now = spec['now']
+    review_id = spec['first_review_id']
+    for offset, count in enumerate(spec['review_counts']):
+        title_id = spec['first_title_id'] + offset
+        rng = random.Random(
+            f'{spec["seed"]}:review:{spec["first_title"] + offset}'
+        )
+        quality = rng.uniform(3, 9)
+        start = rng.randrange(users)
+        step = rng.randrange(1, users) if users > 1 else 1
+        while gcd(step, users) != 1:
+            step = rng.randrange(1, users)
+        for idx in range(count):
+            score = min(10, max(1, round(rng.gauss(quality, 1.5))))
+            date = _date(rng, now)
+            yield (
+                review_id, user_base + (start + idx * step) % users,
+                title_id, rng.choice(texts), score, date, date
+            )
+            review_id += 1
+
+
+def comment_rows(spec):
+    """Комментарии к случайным отзывам каждого произведения пачки."""
+    texts = text_pool(spec['seed'] + 1)
+    users, user_base = spec['users'], spec['first_user_id']
+    now = spec['now']
+    review_id = spec['first_review_id']
+    comment_id = spec['first_comment_id']
+    for offset, (reviews, comments) in enumerate(
+        zip(spec['review_counts'], spec['comment_counts'])
+    ):
+        title_id = spec['first_title_id'] + offset
+        rng = random.Random(
+            f'{spec["seed"]}:comment:{spec["first_title"] + offset}'
+        )
+        for _ in range(comments if reviews else 0):
+            date = _date(rng, now)
+            yield (
+                comment_id, user_base + rng.randrange(users),
+                review_id + rng.randrange(reviews), title_id,
+                rng.choice(texts), date, date
+            )
+            comment_id += 1
+        review_id += reviews
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_statement(table, columns, placeholder):
+    return (
+        f'INSERT INTO {table} ({", ".join(columns)}) '
+        f'VALUES ({", ".join([placeholder] * len(columns))})'
+    )
+
+
+def write_shard(spec):
+    """
+    Записывает отзывы и комментарии пачки произведений в отдельный
+    файл SQLite с таблицами без индексов. Выполняется в дочернем процессе.
+    """
+    db = sqlite3.connect(spec['path'])
+    db.execute('PRAGMA journal_mode = OFF')
+    db.execute('PRAGMA synchronous = OFF')
+    for statement in spec['schema']:
+        db.execute(statement)
+    written = []
+    for table, columns, rows in (
+        (spec['review_table'], REVIEW_COLUMNS, review_rows(spec)),
+        (spec['comment_table'], COMMENT_COLUMNS, comment_rows(spec)),
+    ):
+        sql = insert_statement(table, columns, '?')
+        total = 0
+        for batch in batches(rows, spec['batch_size']):
+            db.executemany(sql, batch)
+            total += len(batch)
+        written.append(total)
+    db.commit()
+    db.close()
+    return tuple(written)
+
+
+def naive_utc_now():
+    return datetime.utcnow().replace(microsecond=0)
@@ -0,0 +1,318 @@
+import multiprocessing
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews import datagen
+from reviews.cache import bump_list_version
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import recalculate_ratings
+from reviews.search import rebuild_search_index
+
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+SHARDS_PER_WORKER = 4
+MAX_GENRES_PER_TITLE = 3
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def create_table_sql(table, columns):
+    return f'CREATE TABLE {table} ({", ".join(columns)})'
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт воспроизводимый синтетический набор данных для '
+        'нагрузочных тестов: отзывы и комментарии распределены '
+        'по произведениям по закону Zipf.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'Количество пользователей.'),
+            ('categories', 10, 'Количество категорий.'),
+            ('genres', 30, 'Количество жанров.'),
+            ('titles', 1000, 'Количество произведений.'),
+            ('reviews', 10000, 'Количество отзывов.'),
+            ('comments', 10000, 'Количество комментариев.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель распределения отзывов по произведениям.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одной вставке.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество процессов, пишущих отзывы и комментарии '
+                'в отдельные файлы SQLite, которые затем сливаются в базу.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        if options['workers'] > 1 and connection.vendor != 'sqlite':
+            raise CommandError(
+                'Параллельная генерация поддерживается только для SQLite.'
+            )
+        if options['reviews'] and not (options['users'] and options['titles']):
+            raise CommandError(
+                'Для отзывов нужны пользователи и произведения.'
+            )
+
+        with self.timed('Пользователи'):
+            first_user_id = self.create_users()
+        with self.timed('Категории и жанры'):
+            categories = self.create_name_slugs(Category, 'categories')
+            genres = self.create_name_slugs(Genre, 'genres')
+        with self.timed('Произведения'):
+            first_title_id = self.create_titles(categories, genres)
+
+        review_counts = datagen.zipf_counts(
+            options['titles'], options['reviews'], options['zipf'],
+            cap=options['users'], seed=options['seed']
+        )
+        spec = {
+            'seed': options['seed'],
+            'now': datagen.naive_utc_now(),
+            'users': options['users'],
+            'first_user_id': first_user_id,
+            'first_title_id': first_title_id,
+            'first_title': 0,
+            'first_review_id': next_id(Review),
+            'first_comment_id': next_id(Comment),
+            'review_counts': review_counts,
+            'comment_counts': datagen.proportional_counts(
+                review_counts, options['comments']
+            ),
+            'batch_size': options['batch_size'],
+        }
+        with self.timed('Отзывы и комментарии'):
+            if options['workers'] > 1:
+                self.write_parallel(spec)
+            else:
+                self.write_direct(spec)
+
+        with self.timed('Рейтинги и поисковый индекс'):
+            with transaction.atomic():
+                recalculate_ratings(
+                    Title.objects.filter(id__gte=first_title_id),
+                    refresh_prior=True
+                )
+                rebuild_search_index()
+        with self.timed('Гистограммы оценок'):
+            call_command('rebuild_score_histograms', stdout=self.stdout)
+        for model in (Category, Genre, Title):
+            bump_list_version(model)
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы'))
+
+    @contextmanager
+    def timed(self, stage):
+        started = perf_counter()
+        yield
+        self.stdout.write(f'{stage}: {perf_counter() - started:.1f} с')
+
+    def create_users(self):
+        first_id = next_id(User)
+        password = make_password(None)
+        users = (
+            User(
+                id=user_id,
+                username=f'user{user_id}',
+                email=f'user{user_id}@example.com',
+                password=password
+            )
+            for user_id in range(first_id, first_id + self.options['users'])
+        )
+        self.bulk_create(User, users)
+        return first_id
+
+    def create_name_slugs(self, model, option):
+        first_id = next_id(model)
+        ids = range(first_id, first_id + self.options[option])
+        name = model._meta.model_name
+        self.bulk_create(model, (
+            model(id=obj_id, name=f'{name} {obj_id}', slug=f'{name}-{obj_id}')
+            for obj_id in ids
+        ))
+        return list(ids)
+
+    def create_titles(self, categories, genres):
+        first_id = next_id(Title)
+        ids = range(first_id, first_id + self.options['titles'])
+        rng = self.rng
+        texts = datagen.text_pool(self.options['seed'] + 2)
+        self.bulk_create(Title, (
+            Title(
+                id=title_id,
+                name=' '.join(rng.sample(datagen.WORDS, 3)).capitalize(),
+                year=rng.randint(1900, 2024),
+                description=rng.choice(texts),
+                category_id=rng.choice(categories) if categories else None
+            )
+            for title_id in ids
+        ))
+        if genres:
+            self.bulk_create(Title.genre.through, (
+                Title.genre.through(title_id=title_id, genre_id=genre_id)
+                for title_id in ids
+                for genre_id in rng.sample(
+                    genres, rng.randint(1, min(MAX_GENRES_PER_TITLE,
+                                               len(genres)))
+                )
+            ))
+        return first_id
+
+    def bulk_create(self, model, objs):
+        for batch in datagen.batches(objs, self.options['batch_size']):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+
+    def write_direct(self, spec):
+        for model, columns, rows in (
+            (Review, datagen.REVIEW_COLUMNS, datagen.review_rows(spec)),
+            (Comment, datagen.COMMENT_COLUMNS, datagen.comment_rows(spec)),
+        ):
+            sql = datagen.insert_statement(
+                model._meta.db_table, columns, '%s'
+            )
+            for batch in datagen.batches(rows, spec['batch_size']):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, batch)
+
+    def shard_specs(self, spec, directory):
+        """
+        Делит произведения на непрерывные диапазоны с примерно равным
+        числом отзывов; первые id отзывов и комментариев каждого диапазона
+        известны заранее, поэтому файлы можно сливать без пересчёта ключей.
+        """
+        review_counts = spec['review_counts']
+        comment_counts = spec['comment_counts']
+        shards = self.options['workers'] * SHARDS_PER_WORKER
+        per_shard = max(1, sum(review_counts) // shards)
+        specs = []
+        start = 0
+        first_review_id = spec['first_review_id']
+        first_comment_id = spec['first_comment_id']
+        while start < len(review_counts):
+            end, reviews = start, 0
+            while end < len(review_counts) and (
+                reviews < per_shard or end == start
+            ):
+                reviews += review_counts[end]
+                end += 1
+            specs.append(dict(
+                spec,
+                path=os.path.join(directory, f'shard{len(specs)}.sqlite3'),
+                schema=[
+                    create_table_sql(model._meta.db_table, columns)
+                    for model, columns in (
+                        (Review, datagen.REVIEW_COLUMNS),
+                        (Comment, datagen.COMMENT_COLUMNS),
+                    )
+                ],
+                review_table=Review._meta.db_table,
+                comment_table=Comment._meta.db_table,
+                first_title_id=spec['first_title_id'] + start,
+                first_title=start,
+                first_review_id=first_review_id,
+                first_comment_id=first_comment_id,
+                review_counts=review_counts[start:end],
+                comment_counts=comment_counts[start:end],
+            ))
+            first_review_id += reviews
+            first_comment_id += sum(comment_counts[start:end])
+            start = end
+        return specs
+
+    @contextmanager
+    def without_indexes(self, models):
+        """
+        Удаляет индексы SQLite на время слияния и создаёт их заново:
+        построить индекс один раз быстрее, чем обновлять его на каждой
+        строке. Индексы уникальных ограничений остаются на месте.
+        """
+        tables = [model._meta.db_table for model in models]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT name, sql FROM sqlite_master WHERE type = %s '
+                f'AND sql IS NOT NULL AND tbl_name IN '
+                f'({", ".join(["%s"] * len(tables))})',
+                ['index', *tables]
+            )
+            indexes = cursor.fetchall()
+            for name, _ in indexes:
+                cursor.execute(f'DROP INDEX "{name}"')
+            try:
+                yield
+            finally:
+                for _, sql in indexes:
+                    cursor.execute(sql)
+
+    def write_parallel(self, spec):
+        with tempfile.TemporaryDirectory() as directory, \
+                self.without_indexes((Review, Comment)):
+            specs = self.shard_specs(spec, directory)
+            # spawn: дочерним процессам не достаются соединения Django.
+            with ProcessPoolExecutor(
+                self.options['workers'],
+                mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                # Файлы сливаются по порядку, пока пишутся следующие.
+                written = executor.map(datagen.write_shard, specs)
+                for shard, _ in zip(specs, written):
+                    self.merge_shard(shard['path'])
+                    os.remove(shard['path'])
+
+    def merge_shard(self, path):
+        with connection.cursor() as cursor:
+            # ATTACH нельзя выполнить внутри транзакции.
+            cursor.execute('ATTACH DATABASE %s AS shard', [path])
+            try:
+                with transaction.atomic():
+                    for model, columns in (
+                        (Review, datagen.REVIEW_COLUMNS),
+                        (Comment, datagen.COMMENT_COLUMNS),
+                    ):
+                        table = model._meta.db_table
+                        names = ', '.join(columns)
+                        cursor.execute(
+                            f'INSERT INTO {table} ({names}) '
+                            f'SELECT {names} FROM shard.{table}'
+                        )
+            finally:
+                cursor.execute('DETACH DATABASE shard')
@@ -0,0 +1,239 @@
+import csv
+import os
+from contextlib import contextmanager
+from itertools import islice
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import recalculate_ratings
+from reviews.search import rebuild_search_index
+
+
+User = get_user_model()
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+BATCH_SIZE = 5000
+
+
+def ids(model):
+    return set(model.objects.values_list('id', flat=True).iterator())
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Сохраняет даты из csv вместо подстановки текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из csv файлов в базу данных '
+        'пакетами через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=DATA_DIR,
+            help='Каталог с csv файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--skip-existing',
+            action='store_true',
+            help='Не обновлять записи, которые уже есть в базе данных.'
+        )
+
+    def handle(self, *args, **options):
+        self.data_dir = options['data_dir']
+        self.batch_size = options['batch_size']
+        self.skip_existing = options['skip_existing']
+
+        self.load('category.csv', Category, self.make_name_slug(Category),
+                  ('name', 'slug'))
+        self.load('genre.csv', Genre, self.make_name_slug(Genre),
+                  ('name', 'slug'))
+        self.load('titles.csv', Title, self.make_title(),
+                  ('name', 'year', 'category'))
+        self.load('genre_title.csv', Title.genre.through,
+                  self.make_genre_title(), None)
+        self.load('users.csv', User, self.make_user(),
+                  ('username', 'email', 'role', 'bio',
+                   'first_name', 'last_name'))
+        with keep_auto_now_add(Review):
+            self.load('review.csv', Review, self.make_review(),
+                      ('title', 'text', 'author', 'score', 'pub_date'))
+        with keep_auto_now_add(Comment):
+            self.load('comments.csv', Comment, self.make_comment(),
+                      ('review', 'title', 'text', 'author', 'pub_date'))
+        with transaction.atomic():
+            recalculate_ratings(Title.objects.all(), refresh_prior=True)
+            rebuild_search_index()
+        call_command('rebuild_score_histograms', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Данные загружены'))
+
+    def load(self, filename, model, make_object, update_fields):
+        """
+        Потоково читает csv и сохраняет строки пакетами.
+        Строки со ссылками на отсутствующие объекты пропускаются.
+        """
+        started = perf_counter()
+        loaded = skipped = 0
+        with open(
+            os.path.join(self.data_dir, filename),
+            newline='',
+            encoding='utf-8'
+        ) as csvfile:
+            reader = csv.DictReader(csvfile)
+            while True:
+                rows = list(islice(reader, self.batch_size))
+                if not rows:
+                    break
+                objs = [
+                    obj for obj in map(make_object, rows) if obj is not None
+                ]
+                with transaction.atomic():
+                    self.save_batch(model, objs, update_fields)
+                loaded += len(objs)
+                skipped += len(rows) - len(objs)
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'{filename}: загружено {loaded}, пропущено {skipped}, '
+            f'{loaded / elapsed if elapsed else 0:.0f} строк/с'
+        )
+
+    def save_batch(self, model, objs, update_fields):
+        if self.skip_existing or not update_fields:
+            model.objects.bulk_create(objs, ignore_conflicts=True)
+            return
+        existing = set(
+            model.objects.filter(pk__in=[obj.pk for obj in objs])
+            .values_list('pk', flat=True)
+        )
+        model.objects.bulk_create(
+            [obj for obj in objs if obj.pk not in existing]
+        )
+        to_update = [obj for obj in objs if obj.pk in existing]
+        if to_update:
+            # bulk_update не заполняет поля с auto_now: без них ETag
+            # изменённых записей остались бы прежними.
+            auto_now = [
+                field.name for field in model._meta.concrete_fields
+                if getattr(field, 'auto_now', False)
+            ]
+            now = timezone.now()
+            for obj in to_update:
+                for name in auto_now:
+                    setattr(obj, name, now)
+            model.objects.bulk_update(to_update, (*update_fields, *auto_now))
+
+    def make_name_slug(self, model):
+        def make(row):
+            return model(
+                id=int(row['id']), name=row['name'], slug=row['slug']
+            )
+        return make
+
+    def make_title(self):
+        category_ids = ids(Category)
+
+        def make(row):
+            category_id = int(row['category']) if row['category'] else None
+            return Title(
+                id=int(row['id']),
+                name=row['name'],
+                year=row['year'],
+                category_id=(
+                    category_id if category_id in category_ids else None
+                )
+            )
+        return make
+
+    def make_genre_title(self):
+        title_ids = ids(Title)
+        genre_ids = ids(Genre)
+
+        def make(row):
+            title_id = int(row['title_id'])
+            genre_id = int(row['genre_id'])
+            if title_id not in title_ids or genre_id not in genre_ids:
+                return None
+            return Title.genre.through(
+                id=int(row['id']), title_id=title_id, genre_id=genre_id
+            )
+        return make
+
+    def make_user(self):
+        def make(row):
+            return User(
+                id=int(row['id']),
+                username=row['username'],
+                email=row['email'],
+                role=row['role'],
+                bio=row['bio'] or '',
+                first_name=row['first_name'] or '',
+                last_name=row['last_name'] or ''
+            )
+        return make
+
+    def make_review(self):
+        title_ids = ids(Title)
+        user_ids = ids(User)
+
+        def make(row):
+            title_id = int(row['title_id'])
+            author_id = int(row['author'])
+            if title_id not in title_ids or author_id not in user_ids:
+                return None
+            return Review(
+                id=int(row['id']),
+                title_id=title_id,
+                text=row['text'],
+                author_id=author_id,
+                score=row['score'],
+                pub_date=row['pub_date']
+            )
+        return make
+
+    def make_comment(self):
+        review_titles = dict(
+            Review.objects.values_list('id', 'title_id').iterator()
+        )
+        user_ids = ids(User)
+
+        def make(row):
+            review_id = int(row['review_id'])
+            author_id = int(row['author'])
+            if review_id not in review_titles or author_id not in user_ids:
+                return None
+            return Comment(
+                id=int(row['id']),
+                review_id=review_id,
+                title_id=review_titles[review_id],
+                text=row['text'],
+                author_id=author_id,
+                pub_date=row['pub_date']
+            )
+        return make
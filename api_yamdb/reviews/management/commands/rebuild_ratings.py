@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.ratings import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые рейтинги произведений по отзывам '
+        'и среднюю оценку для байесовского рейтинга. Запускается '
+        'по расписанию, чтобы обновлять рейтинг лучших произведений.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_ratings(
+                Title.objects.all(), refresh_prior=True
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинги пересчитаны: {updated}')
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.ratings import recalculate_score_histograms
+
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает гистограммы оценок всех произведений пачками: '
+        'один запрос к отзывам и одна запись на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество произведений в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        last_id = 0
+        while True:
+            chunk = list(
+                Title.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:options['chunk_size']]
+            )
+            if not chunk:
+                break
+            with transaction.atomic():
+                total += recalculate_score_histograms(chunk)
+            last_id = chunk[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Гистограммы оценок пересчитаны: {total}')
+        )
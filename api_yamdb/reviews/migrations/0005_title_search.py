@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+# Копия SQL на момент миграции: код reviews.search может меняться.
+CREATE_INDEX_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts '
+    'USING fts5(name, description)'
+)
+FILL_INDEX_SQL = (
+    'INSERT INTO reviews_title_fts (rowid, name, description) '
+    'SELECT id, name, description FROM reviews_title'
+)
+DROP_INDEX_SQL = 'DROP TABLE IF EXISTS reviews_title_fts'
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_INDEX_SQL)
+            cursor.execute(FILL_INDEX_SQL)
+    except OperationalError:
+        # SQLite собран без FTS5, поиск работает через icontains.
+        connection.title_search_available = False
+    else:
+        connection.title_search_available = True
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(DROP_INDEX_SQL)
+        connection.title_search_available = False
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_pub_date_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
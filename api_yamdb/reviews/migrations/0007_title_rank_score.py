@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-18 09:02
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+# Значения reviews.constants на момент миграции: изменение констант
+# не должно менять то, что она считает.
+LEADERBOARD_PRIOR_WEIGHT = 5
+DEFAULT_PRIOR_MEAN = 5.5
+
+
+def fill_rank_scores(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.aggregate(
+        total=Sum('rating_sum'), count=Sum('rating_count')
+    )
+    if totals['count']:
+        mean = totals['total'] / totals['count']
+    else:
+        mean = DEFAULT_PRIOR_MEAN
+    Title.objects.update(
+        rank_score=(
+            (F('rating_sum') + LEADERBOARD_PRIOR_WEIGHT * mean)
+            / (F('rating_count') + LEADERBOARD_PRIOR_WEIGHT)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rank_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Байесовский рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rank_score', 'id'], name='title_rank_idx'),
+        ),
+        migrations.RunPython(fill_rank_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-rank_score', 'id'], name='title_category_rank_idx'),
+        ),
+    ]
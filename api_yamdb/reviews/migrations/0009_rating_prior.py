@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 09:45
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_prior(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    RatingPrior = apps.get_model('reviews', 'RatingPrior')
+    totals = Title.objects.aggregate(
+        total=Sum('rating_sum'), count=Sum('rating_count')
+    )
+    if totals['count']:
+        RatingPrior.objects.create(
+            pk=1, mean=totals['total'] / totals['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_score_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='Средняя оценка')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата расчёта')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка рейтинга',
+                'verbose_name_plural': 'Средняя оценка рейтинга',
+            },
+        ),
+        migrations.RunPython(fill_prior, migrations.RunPython.noop),
+    ]
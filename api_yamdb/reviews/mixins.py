@@ -1,9 +1,138 @@
-from rest_framework import filters
+from hashlib import md5
 
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import filters, status
+from rest_framework.response import Response
+
+from api.pagination import PageNumberOrCursorPagination, is_cursor_requested
 from api.permissions import IsAdminOrReadOnly
+from .cache import (
+    cache_list, get_cached_list, get_list_version, list_cache_key
+)
+
+
+class CachedListMixin:
+    """
+    Кеширует ответы списка до изменения объектов модели
+    и отвечает 304 на `If-None-Match` без обращения к БД:
+    токен проверяется как обычно, а пользователь берётся
+    из кеша аутентификации.
+    """
+
+    def list(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        # Ссылки на страницы абсолютные, поэтому адрес берётся с хостом.
+        key = list_cache_key(
+            model,
+            get_list_version(model),
+            request.accepted_media_type,
+            request.build_absolute_uri()
+        )
+        cached = get_cached_list(key)
+        if cached is None:
+            cached = cache_list(
+                key,
+                super().list(request, *args, **kwargs).data,
+                request.accepted_media_type
+            )
+        etag, data = cached
+        etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in etags or '*' in etags:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        return Response(data, headers={'ETag': etag})
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def list_etag(request, *parts):
+    return quote_etag(md5(
+        ':'.join(map(str, (
+            *parts, request.accepted_media_type, request.get_full_path()
+        ))).encode()
+    ).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 на `If-None-Match` и `If-Modified-Since` по полю
+    `updated_at`, не сериализуя объекты.
+    """
+
+    def conditional_response(self, request, etag, last_modified):
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=(
+                int(last_modified.timestamp()) if last_modified else None
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(self.paginator, PageNumberOrCursorPagination) and (
+            is_cursor_requested(request)
+        ):
+            return self.cursor_list(request, queryset)
+        stats = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('pk')
+        )
+        etag = list_etag(request, stats['count'], stats['last_modified'])
+        response = self.conditional_response(
+            request, etag, stats['last_modified']
+        )
+        if response is None:
+            queryset.precomputed_count = stats['count']
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                response = self.get_paginated_response(serializer.data)
+            else:
+                serializer = self.get_serializer(queryset, many=True)
+                response = Response(serializer.data)
+        return set_validators(response, etag, stats['last_modified'])
+
+    def cursor_list(self, request, queryset):
+        """
+        Курсорный режим не считает записи, поэтому ETag строится по
+        строкам страницы и ссылкам на соседние страницы, без обхода всей
+        выборки. `Last-Modified` не отдаётся: по строкам страницы нельзя
+        заметить удаление записи.
+        """
+        page = self.paginate_queryset(queryset)
+        etag = list_etag(
+            request,
+            [(row.pk, row.updated_at) for row in page],
+            *self.paginator.get_links()
+        )
+        response = self.conditional_response(request, etag, None)
+        if response is None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        return set_validators(response, etag, None)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = quote_etag(
+            f'{instance.pk}-{instance.updated_at.timestamp()}'
+        )
+        response = self.conditional_response(
+            request, etag, instance.updated_at
+        )
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, instance.updated_at)
 
 
-class CategoryGenreMixin:
+class CategoryGenreMixin(CachedListMixin):
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
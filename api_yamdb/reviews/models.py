@@ -1,6 +1,6 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
 from .constants import (
     MAX_LENGTH_MAIN,
@@ -69,14 +69,145 @@ class Title(models.Model):
         blank=True,
         max_length=MAX_LENGTH_MAIN
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rank_score = models.FloatField(
+        'Байесовский рейтинг',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    # Поля, которые меняют только сигналы отзывов через F()-выражения.
+    RATING_FIELDS = ('rating_sum', 'rating_count', 'rank_score')
 
     def __str__(self) -> str:
         return self.name
 
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """
+        Сохранение существующего произведения не записывает счётчики
+        оценок: значения в объекте могут устареть, пока параллельно
+        добавляются отзывы.
+        """
+        if update_fields is None and not force_insert and (
+            not self._state.adding
+        ):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
+    @property
+    def rating(self):
+        """Средняя оценка по сохранённым счётчикам отзывов."""
+        # ratings импортирует модели, поэтому импорт отложен.
+        from .ratings import rating_from_counters
+        return rating_from_counters(self.rating_sum, self.rating_count)
+
     class Meta:
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(
+                fields=('-rank_score', 'id'), name='title_rank_idx'
+            ),
+            models.Index(
+                fields=('category', '-rank_score', 'id'),
+                name='title_category_rank_idx'
+            ),
+        )
+
+
+class TitleSearchIndex(models.Model):
+    """
+    Полнотекстовый индекс FTS5 произведений (таблица создаётся миграцией
+    0005 только в SQLite). Модель нужна, чтобы соединить индекс
+    с произведениями в запросе ORM; записи пишет модуль reviews.search.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index'
+    )
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
+
+class RatingPrior(models.Model):
+    """
+    Средняя оценка по всем отзывам — априорное значение байесовского
+    рейтинга. Одна запись, общая для всех процессов; её обновляет
+    команда rebuild_ratings.
+    """
+    mean = models.FloatField('Средняя оценка')
+    updated_at = models.DateTimeField('Дата расчёта', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Средняя оценка рейтинга'
+        verbose_name_plural = 'Средняя оценка рейтинга'
+
+    def __str__(self) -> str:
+        return f'{self.mean:.2f}'
+
+
+class ScoreHistogram(models.Model):
+    """
+    Количество отзывов с каждой оценкой от MIN_SCORE до MAX_SCORE,
+    по полю `score_<оценка>` на оценку.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_histogram'
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    @property
+    def counts(self):
+        return [getattr(self, field) for field in SCORE_FIELDS]
+
+
+SCORE_FIELDS = tuple(
+    f'score_{score}' for score in range(MIN_SCORE, MAX_SCORE + 1)
+)
+# Поля гистограммы объявлены явно для миграций: при смене диапазона
+# оценок их нужно поменять вместе с MIN_SCORE и MAX_SCORE.
+assert SCORE_FIELDS == tuple(
+    field.name for field in ScoreHistogram._meta.concrete_fields
+    if field.name.startswith('score_')
+), 'Поля ScoreHistogram не совпадают с диапазоном оценок.'
 
 
 class Review(models.Model):
@@ -93,12 +224,19 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         ordering = ('pub_date',)
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -109,6 +247,24 @@ class Review(models.Model):
     def __str__(self):
         return f'review by {self.author} on title {self.title}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating()
+        return instance
+
+    def remember_rating(self):
+        """Запоминает произведение и оценку, учтённые в рейтинге."""
+        self._rated = (
+            self.__dict__.get('title_id'),
+            self.__dict__.get('score')
+        )
+
+    def save(self, *args, **kwargs):
+        # Счётчики рейтинга обновляются в post_save в той же транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -120,12 +276,19 @@ class Comment(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         ordering = ('pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'comment by {self.author} on review {self.review}'
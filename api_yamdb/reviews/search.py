@@ -0,0 +1,84 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, Q
+from django.db.models.expressions import RawSQL
+
+from .models import TitleSearchIndex
+
+
+TITLE_SEARCH_TABLE = TitleSearchIndex._meta.db_table
+
+
+def search_available(db=connection):
+    """Полнотекстовый индекс есть только в SQLite с модулем FTS5."""
+    if db.vendor != 'sqlite':
+        return False
+    available = getattr(db, 'title_search_available', None)
+    if available is None:
+        available = TITLE_SEARCH_TABLE in db.introspection.table_names()
+        db.title_search_available = available
+    return available
+
+
+def rebuild_search_index(db=connection):
+    """Заново заполняет индекс по таблице произведений."""
+    if not search_available(db):
+        return
+    with db.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TITLE_SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {TITLE_SEARCH_TABLE} (rowid, name, description) '
+            'SELECT id, name, description FROM reviews_title'
+        )
+
+
+def index_title(title):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {TITLE_SEARCH_TABLE} WHERE rowid = %s', [title.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {TITLE_SEARCH_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description]
+        )
+
+
+def unindex_title(title_id):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {TITLE_SEARCH_TABLE} WHERE rowid = %s', [title_id]
+        )
+
+
+def to_match_query(text):
+    """Каждое слово запроса ищется как префикс, все слова обязательны."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    """
+    Фильтрует произведения по названию и описанию,
+    упорядочивая их по релевантности.
+    """
+    match = to_match_query(text)
+    if not match or not search_available():
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    # Соединение с индексом, а не подзапрос на каждую строку: FTS5
+    # вычисляет MATCH и rank один раз для всего запроса.
+    return queryset.filter(
+        RawSQL(
+            f'{TITLE_SEARCH_TABLE} MATCH %s', [match],
+            output_field=BooleanField()
+        ),
+        search_index__isnull=False,
+    ).annotate(
+        search_rank=F('search_index__rank')
+    ).order_by('search_rank', 'name')
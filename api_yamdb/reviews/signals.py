@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_list_version
+from .models import (
+    Category, Comment, Genre, Review, ScoreHistogram, Title
+)
+from .ratings import (
+    rank_score, recalculate_ratings, recalculate_score_histograms
+)
+from .search import index_title, unindex_title
+
+
+def _change_rating(title_id, score_delta, count_delta):
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+        rank_score=rank_score(score_delta, count_delta),
+        updated_at=timezone.now()
+    )
+
+
+def _change_histogram(title_id, changes, backfill=True):
+    """
+    Меняет количество отзывов с оценками: `changes` — {оценка: +-1}.
+    Строки гистограммы нет у произведений, созданных через bulk_create:
+    при `backfill` она считается по отзывам. При удалении отзыва
+    строка не создаётся — отзыв мог удаляться вместе с произведением.
+    """
+    updated = ScoreHistogram.objects.filter(title_id=title_id).update(**{
+        f'score_{score}': F(f'score_{score}') + delta
+        for score, delta in changes.items()
+    })
+    if not updated and backfill:
+        recalculate_score_histograms([title_id])
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новый или изменённый отзыв в рейтинге произведения."""
+    if created:
+        _change_rating(instance.title_id, instance.score, 1)
+        _change_histogram(instance.title_id, {instance.score: 1})
+    elif not hasattr(instance, '_rated'):
+        recalculate_ratings(Title.objects.filter(pk=instance.title_id))
+        recalculate_score_histograms([instance.title_id])
+    else:
+        old_title_id, old_score = instance._rated
+        if old_title_id != instance.title_id:
+            _change_rating(old_title_id, -old_score, -1)
+            _change_rating(instance.title_id, instance.score, 1)
+            _change_histogram(old_title_id, {old_score: -1})
+            _change_histogram(instance.title_id, {instance.score: 1})
+        elif old_score != instance.score:
+            _change_rating(instance.title_id, instance.score - old_score, 0)
+            _change_histogram(
+                instance.title_id, {old_score: -1, instance.score: 1}
+            )
+    instance.remember_rating()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает удалённый отзыв из рейтинга произведения."""
+    title_id, score = getattr(
+        instance, '_rated', (instance.title_id, instance.score)
+    )
+    _change_rating(title_id, -score, -1)
+    _change_histogram(title_id, {score: -1}, backfill=False)
+
+
+@receiver(post_save, sender=Title)
+def update_search_index_on_save(sender, instance, **kwargs):
+    index_title(instance)
+
+
+@receiver(post_save, sender=Title)
+def create_score_histogram(sender, instance, created, **kwargs):
+    if created:
+        ScoreHistogram.objects.create(title=instance)
+
+
+@receiver(post_delete, sender=Title)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    unindex_title(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_cached_lists(sender, **kwargs):
+    bump_list_version(sender)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, created=False, **kwargs):
+    """
+    Произведения выводят название и slug категории, а удаление категории
+    обнуляет ссылку через update() без сигналов: ETag и Last-Modified
+    произведений должны измениться.
+    """
+    if not created:
+        Title.objects.filter(category=instance).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, created=False, **kwargs):
+    """Удаление жанра удаляет связи с произведениями без m2m_changed."""
+    if not created:
+        Title.objects.filter(genre=instance).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_titles_on_genre_change(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+    elif action == 'pre_clear':
+        titles = Title.objects.filter(genre=instance)
+    else:
+        titles = Title.objects.filter(pk__in=pk_set)
+    titles.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_author_reviews(sender, instance, **kwargs):
+    """
+    Отзывы и комментарии выводят имя автора: после его смены ETag
+    и Last-Modified отзывов и комментариев должны измениться.
+    """
+    if getattr(instance, 'username_changed', False):
+        now = timezone.now()
+        Review.objects.filter(author=instance).update(updated_at=now)
+        Comment.objects.filter(author=instance).update(updated_at=now)
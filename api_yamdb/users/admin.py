@@ -1,7 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import ApplicationUser
+from .models import ApplicationUser, OutgoingEmail
 
 
 admin.site.register(ApplicationUser, UserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'created_at', 'sent_at',
+                    'attempts', 'next_attempt_at')
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
@@ -14,3 +14,19 @@ USER_ROLES = (
 # Список различных констант
 MAX_CHARFIELD_LENGTH = 150
 MAX_EMAIL_LENGTH = 254
+MAX_SUBJECT_LENGTH = 255
+
+# Очередь исходящих писем
+EMAIL_BATCH_SIZE = 100
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_POLL_INTERVAL = 5
+# Пауза перед повтором после ошибки, удваивается с каждой попыткой, секунды
+EMAIL_RETRY_DELAY = 60
+# Время, на которое обработчик захватывает пачку писем, секунды
+EMAIL_CLAIM_TIMEOUT = 600
+
+# Время жизни данных пользователя в кеше аутентификации, секунды
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Время жизни списка отзывов ролей в кеше, секунды
+ROLE_REVOCATIONS_CACHE_TIMEOUT = 10
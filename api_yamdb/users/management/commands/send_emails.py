@@ -0,0 +1,46 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from users.constants import EMAIL_BATCH_SIZE, EMAIL_POLL_INTERVAL
+from users.outbox import send_pending_emails
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EMAIL_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=EMAIL_POLL_INTERVAL,
+            help=(
+                'Пауза в секундах, если в пачке не удалось '
+                'отправить ни одного письма.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        total = 0
+        while True:
+            sent = send_pending_emails(options['batch_size'], connection)
+            total += sent
+            if sent:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(f'Отправлено писем: {total}')
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleRevocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(db_index=True, verbose_name='Пользователь')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата отзыва')),
+            ],
+            options={
+                'verbose_name': 'Отзыв ролей из токенов',
+                'verbose_name_plural': 'Отзывы ролей из токенов',
+                'ordering': ('-revoked_at',),
+            },
+        ),
+    ]
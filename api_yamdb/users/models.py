@@ -1,9 +1,11 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from .constants import (
     MAX_CHARFIELD_LENGTH,
     MAX_EMAIL_LENGTH,
+    MAX_SUBJECT_LENGTH,
     USER_ROLES,
     USER_ROLE_ADMIN,
     USER_ROLE_MODERATOR
@@ -72,3 +74,83 @@ class ApplicationUser(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == USER_ROLE_MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField(
+        max_length=MAX_SUBJECT_LENGTH,
+        verbose_name='Тема',
+    )
+    message = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        max_length=MAX_EMAIL_LENGTH,
+        verbose_name='Отправитель',
+    )
+    recipient = models.EmailField(
+        max_length=MAX_EMAIL_LENGTH,
+        verbose_name='Получатель',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Дата отправки',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попытки отправки',
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name='Следующая попытка',
+    )
+    claim = models.CharField(
+        max_length=32,
+        blank=True,
+        db_index=True,
+        verbose_name='Метка обработчика',
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('created_at', 'id')
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient}'
+
+
+class RoleRevocation(models.Model):
+    """
+    Смена роли пользователя. Токены с ролью, выданные раньше,
+    не используются для проверки прав.
+    """
+
+    user_id = models.BigIntegerField(
+        db_index=True,
+        verbose_name='Пользователь',
+    )
+    revoked_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата отзыва',
+    )
+
+    class Meta:
+        verbose_name = 'Отзыв ролей из токенов'
+        verbose_name_plural = 'Отзывы ролей из токенов'
+        ordering = ('-revoked_at',)
+
+    def __str__(self):
+        return f'Пользователь {self.user_id}: {self.revoked_at}'
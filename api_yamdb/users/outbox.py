@@ -0,0 +1,102 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .constants import (
+    EMAIL_BATCH_SIZE,
+    EMAIL_CLAIM_TIMEOUT,
+    EMAIL_MAX_ATTEMPTS,
+    EMAIL_RETRY_DELAY
+)
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, message, recipient):
+    """Ставит письмо в очередь, отправку выполняет `send_emails`."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=settings.EMAIL_FROM,
+        recipient=recipient,
+    )
+
+
+def claim_emails(batch_size):
+    """
+    Захватывает пачку писем, срок отправки которых наступил.
+
+    Условный UPDATE переносит следующую попытку на EMAIL_CLAIM_TIMEOUT
+    вперёд, поэтому другой обработчик эти письма уже не выберет, а письма
+    упавшего обработчика вернутся в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=EMAIL_MAX_ATTEMPTS,
+        next_attempt_at__lte=now,
+    )
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    claim = uuid4().hex
+    due.filter(pk__in=ids).update(
+        claim=claim,
+        next_attempt_at=now + timedelta(seconds=EMAIL_CLAIM_TIMEOUT),
+    )
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def defer_email(email, error):
+    """Записывает ошибку и откладывает повтор с экспоненциальной паузой."""
+    delay = EMAIL_RETRY_DELAY * 2 ** email.attempts
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        attempts=F('attempts') + 1,
+        error=str(error),
+        claim='',
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def send_pending_emails(batch_size=EMAIL_BATCH_SIZE, connection=None):
+    """
+    Отправляет одну пачку писем из очереди через одно соединение.
+    Возвращает количество отправленных писем.
+    """
+    emails = claim_emails(batch_size)
+    if not emails:
+        return 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            defer_email(email, error)
+        return 0
+    sent_ids = []
+    try:
+        for email in emails:
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    from_email=email.from_email,
+                    to=[email.recipient],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                defer_email(email, error)
+            else:
+                sent_ids.append(email.pk)
+    finally:
+        OutgoingEmail.objects.filter(pk__in=sent_ids).update(
+            sent_at=timezone.now(),
+            attempts=F('attempts') + 1,
+            error='',
+            claim='',
+        )
+        connection.close()
+    return len(sent_ids)
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api.authentication import forget_user, revoke_role_claims
+from .models import ApplicationUser
+
+
+# Поля, по которым выдаются права в токенах с ролями.
+TOKEN_CLAIM_FIELDS = (
+    'username', 'password', 'role', 'is_staff', 'is_superuser', 'is_active'
+)
+
+
+@receiver(pre_save, sender=ApplicationUser)
+def detect_role_change(sender, instance, **kwargs):
+    previous = sender.objects.filter(pk=instance.pk).values(
+        *TOKEN_CLAIM_FIELDS
+    ).first() if instance.pk else None
+    instance.role_changed = previous is not None and any(
+        previous[field] != getattr(instance, field)
+        for field in TOKEN_CLAIM_FIELDS
+    )
+    instance.username_changed = previous is not None and (
+        previous['username'] != instance.username
+    )
+
+
+@receiver(post_save, sender=ApplicationUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    if getattr(instance, 'role_changed', False):
+        revoke_role_claims(instance.pk)
+
+
+@receiver(post_delete, sender=ApplicationUser)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    revoke_role_claims(instance.pk)
@@ -0,0 +1,211 @@
+"""
+Нагрузочное сравнение WSGI (gunicorn) и ASGI (uvicorn) с синхронными
+и асинхронными представлениями на частых запросах на чтение.
+
+Запуск из корня репозитория (нужны gunicorn и uvicorn):
+    python benchmarks/asgi_vs_wsgi.py --connections 50 --slow-clients 200
+
+Данные загружаются командой load_csv во временную базу данных.
+Медленные клиенты отправляют заголовки запроса по одному в секунду
+и занимают соединения до конца замера.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import quantiles
+
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+HOST = '127.0.0.1'
+SETTINGS = '''from api_yamdb.settings import *  # noqa
+
+DEBUG = False
+QUERY_INSTRUMENTATION = False
+DATABASES['default']['NAME'] = {database!r}
+'''
+
+
+def prepare(directory):
+    database = os.path.join(directory, 'db.sqlite3')
+    with open(os.path.join(directory, 'bench_settings.py'), 'w') as file:
+        file.write(SETTINGS.format(database=database))
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join((directory, PROJECT_DIR)),
+        DJANGO_SETTINGS_MODULE='bench_settings',
+        DATABASE_PROFILE='sqlite-performance',
+    )
+    for command in (('migrate', '-v0'), ('load_csv',)):
+        subprocess.run(
+            (sys.executable, 'manage.py') + command,
+            cwd=PROJECT_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+    with sqlite3.connect(database) as db:
+        title_id, review_id = db.execute(
+            'SELECT review.title_id, review.id FROM reviews_comment comment '
+            'JOIN reviews_review review ON review.id = comment.review_id '
+            'LIMIT 1'
+        ).fetchone()
+    paths = (
+        '/api/v1/titles/',
+        f'/api/v1/titles/{title_id}/',
+        f'/api/v1/titles/{title_id}/reviews/',
+        f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    )
+    return env, paths
+
+
+def server_commands(port, args):
+    """Команда запуска сервера и значение ASYNC_VIEWS для неё."""
+    gunicorn = (
+        sys.executable, '-m', 'gunicorn', 'api_yamdb.wsgi:application',
+        '--bind', f'{HOST}:{port}', '--workers', str(args.workers),
+        '--threads', str(args.threads), '--worker-class', 'gthread',
+        '--log-level', 'warning',
+    )
+    uvicorn = (
+        sys.executable, '-m', 'uvicorn', 'api_yamdb.asgi:application',
+        '--host', HOST, '--port', str(port),
+        '--workers', str(args.workers), '--log-level', 'warning',
+    )
+    return {
+        'wsgi': (gunicorn, '0'),
+        'asgi-sync': (uvicorn, '0'),
+        'asgi': (uvicorn, '1'),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Сервер на порту {port} не запустился')
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        name, _, value = line.partition(b':')
+        if name.lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    idx = 0
+    try:
+        while time.monotonic() < deadline:
+            path = paths[idx % len(paths)]
+            idx += 1
+            started = time.perf_counter()
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n'.encode()
+            )
+            try:
+                status = await read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                errors.append(path)
+                writer.close()
+                reader, writer = await asyncio.open_connection(HOST, port)
+                continue
+            if status != 200:
+                errors.append(path)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def slow_client(port, path, deadline):
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n'.encode())
+        header = 0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            header += 1
+            writer.write(f'X-Slow-{header}: 1\r\n'.encode())
+            await writer.drain()
+        writer.close()
+    except ConnectionError:
+        pass
+
+
+async def load(port, paths, args):
+    deadline = time.monotonic() + args.duration
+    latencies, errors = [], []
+    slow = [
+        asyncio.create_task(slow_client(port, paths[0], deadline))
+        for _ in range(args.slow_clients)
+    ]
+    await asyncio.sleep(0.5)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, paths, deadline, latencies, errors)
+        for _ in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - started
+    for task in slow:
+        task.cancel()
+    return latencies, len(errors), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Потоков в процессе gunicorn.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env, paths = prepare(directory)
+        env['ASYNC_DB_WORKERS'] = str(args.threads)
+        print(f'{"сервер":<10} {"запросов/с":>11} {"p50 мс":>8} '
+              f'{"p95 мс":>8} {"p99 мс":>8} {"ошибок":>7}')
+        for name in ('wsgi', 'asgi-sync', 'asgi'):
+            port = free_port()
+            command, async_views = server_commands(port, args)[name]
+            server = subprocess.Popen(
+                command, cwd=PROJECT_DIR,
+                env=dict(env, ASYNC_VIEWS=async_views)
+            )
+            try:
+                wait_for_port(port)
+                latencies, errors, elapsed = asyncio.run(
+                    load(port, paths, args)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            cuts = quantiles(latencies, n=100)
+            print(f'{name:<10} {len(latencies) / elapsed:>11.0f} '
+                  f'{cuts[49] * 1000:>8.1f} {cuts[94] * 1000:>8.1f} '
+                  f'{cuts[98] * 1000:>8.1f} {errors:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,398 @@
+"""
+Нагрузочный тест API смесью запросов из коллекции Postman.
+
+Запросы берутся из папок коллекции postman_collection: просмотр
+произведений, чтение отзывов, регистрация, получение токена и публикация
+отзыва. Переменные коллекции подставляются из сгенерированных данных,
+каждый сценарий выбирается с заданным весом.
+
+Запуск из корня репозитория (нужны gunicorn и uvicorn):
+    python benchmarks/http_mix.py --output results/HEAD.json
+    python benchmarks/http_mix.py --compare results/HEAD.json
+
+Сервер запускается на временной базе данных, наполненной командой
+generate_data. Результаты по каждому запросу коллекции (запросов в
+секунду, p50/p95/p99, ошибки) сохраняются в JSON вместе с коммитом,
+чтобы сравнивать их между коммитами.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import count
+from statistics import quantiles
+from urllib.parse import quote
+
+from asgi_vs_wsgi import (
+    HOST, PROJECT_DIR, SETTINGS, free_port, read_response, server_commands,
+    wait_for_port
+)
+
+
+COLLECTION = os.path.join(
+    os.path.dirname(PROJECT_DIR), 'postman_collection',
+    'Ymdb-collection.postman_collection.json'
+)
+# Сценарий: папка коллекции и вес по умолчанию.
+SCENARIOS = {
+    'title-browse': ('get_titles_info', 50),
+    'review-read': ('get_reviews', 30),
+    'review-post': ('create_reviews', 10),
+    'signup': ('get_confirmatior_codes', 5),
+    'token': ('get_tokens', 5),
+}
+VARIABLE = re.compile(r'{{(\w+)}}')
+BENCH_USERS = '''import json
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from api.authentication import make_access_token
+User = get_user_model()
+users = [
+    User.objects.create(username=f'bench{{idx}}',
+                        email=f'bench{{idx}}@example.com')
+    for idx in range({users})
+]
+print(json.dumps([
+    [user.username, default_token_generator.make_token(user),
+     str(make_access_token(user))]
+    for user in users
+]))
+'''
+
+
+def find_folder(items, name):
+    for item in items:
+        if item['name'] == name:
+            return item
+        found = find_folder(item.get('item', ()), name)
+        if found:
+            return found
+    return None
+
+
+def load_requests(path):
+    """Запросы папок сценариев: метод, путь, тело и переменная токена."""
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    requests = {}
+    for scenario, (folder, _) in SCENARIOS.items():
+        items = find_folder(collection['item'], folder)
+        if items is None:
+            raise ValueError(f'В коллекции нет папки {folder}')
+        requests[scenario] = []
+        for item in items['item']:
+            request = item['request']
+            url = request['url']['raw']
+            path = '/' + url.split('/', 3)[3]
+            token = None
+            auth = request.get('auth') or {}
+            for option in auth.get('bearer', ()):
+                if option['key'] == 'token':
+                    token = option['value']
+            requests[scenario].append({
+                'label': f'{request["method"]} {path}',
+                'method': request['method'],
+                'path': path,
+                'body': request.get('body', {}).get('raw'),
+                'token': token,
+            })
+    return requests
+
+
+def prepare(directory, args):
+    database = os.path.join(directory, 'db.sqlite3')
+    with open(os.path.join(directory, 'bench_settings.py'), 'w') as file:
+        file.write(SETTINGS.format(database=database))
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join((directory, PROJECT_DIR)),
+        DJANGO_SETTINGS_MODULE='bench_settings',
+        DATABASE_PROFILE='sqlite-performance',
+    )
+    for command in (
+        ('migrate', '-v0'),
+        ('generate_data', '--users', str(args.users),
+         '--titles', str(args.titles), '--reviews', str(args.reviews),
+         '--comments', str(args.reviews // 2), '--seed', str(args.seed)),
+    ):
+        subprocess.run(
+            (sys.executable, 'manage.py') + command,
+            cwd=PROJECT_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+    users = json.loads(subprocess.run(
+        (sys.executable, 'manage.py', 'shell', '-c',
+         BENCH_USERS.format(users=args.bench_users)),
+        cwd=PROJECT_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout)
+    with sqlite3.connect(database) as db:
+        reviews = db.execute(
+            'SELECT review.title_id, review.id, category.slug, genre.slug, '
+            'title.name, title.year FROM reviews_review review '
+            'JOIN reviews_title title ON title.id = review.title_id '
+            'JOIN reviews_category category '
+            'ON category.id = title.category_id '
+            'JOIN reviews_title_genre title_genre '
+            'ON title_genre.title_id = title.id '
+            'JOIN reviews_genre genre ON genre.id = title_genre.genre_id '
+            'ORDER BY random() LIMIT 1000'
+        ).fetchall()
+        titles = [row[0] for row in db.execute(
+            'SELECT id FROM reviews_title ORDER BY id'
+        )]
+    return env, Data(users, reviews, titles)
+
+
+class Data:
+    """Значения переменных коллекции для очередного запроса."""
+
+    def __init__(self, users, reviews, titles):
+        self.users = users
+        self.reviews = reviews
+        self.titles = titles
+        self.posts = count()
+        self.signups = count()
+
+    def variables(self, scenario, rng):
+        title, review, category, genre, name, year = rng.choice(self.reviews)
+        username, code, token = rng.choice(self.users)
+        if scenario == 'review-post':
+            # Каждая пара пользователь-произведение используется один раз.
+            post = next(self.posts)
+            username, code, token = self.users[post % len(self.users)]
+            title = self.titles[post // len(self.users) % len(self.titles)]
+        if scenario == 'signup':
+            signup = f'signup{os.getpid()}-{next(self.signups)}'
+            username, email = signup, f'{signup}@example.com'
+        else:
+            email = f'{username}@example.com'
+        return {
+            'Title': title, 'Review': review, 'Category': category,
+            'Genre': genre, 'TitleName': name, 'TitleYear': year,
+            'Username': username, 'Email': email, 'ConfirmationCode': code,
+            'Token': token,
+        }
+
+
+def substitute(template, values):
+    """Подставляет значения в `{{adminTitle}}`, `{{userToken}}` и т.п."""
+    def replace(match):
+        for suffix, value in values.items():
+            if match.group(1).endswith(suffix):
+                return str(value)
+        raise KeyError(match.group(1))
+    return VARIABLE.sub(replace, template)
+
+
+def build_request(request, values):
+    path = substitute(request['path'], {
+        name: quote(str(value)) for name, value in values.items()
+    })
+    body = b''
+    headers = [f'Host: {HOST}']
+    if request['body']:
+        data = json.loads(substitute(request['body'], values))
+        if 'username' in data and 'email' in data:
+            # Регистрация каждый раз с новыми именем и почтой.
+            data['username'] = values['Username']
+            data['email'] = values['Email']
+        body = json.dumps(data).encode()
+        headers += [
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+        ]
+    if request['token']:
+        headers.append(
+            f'Authorization: Bearer {substitute(request["token"], values)}'
+        )
+    head = f'{request["method"]} {path} HTTP/1.1\r\n'
+    return (head + '\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+
+async def client(port, requests, weights, data, deadline, results, seed):
+    rng = random.Random(seed)
+    scenarios = list(weights)
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        while time.monotonic() < deadline:
+            scenario = rng.choices(scenarios, list(weights.values()))[0]
+            request = rng.choice(requests[scenario])
+            message = build_request(
+                request, data.variables(scenario, rng)
+            )
+            started = time.perf_counter()
+            writer.write(message)
+            try:
+                status = await read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                status = None
+                writer.close()
+                reader, writer = await asyncio.open_connection(HOST, port)
+            latency = time.perf_counter() - started
+            results[(scenario, request['label'])].append(
+                (latency, status is not None and 200 <= status < 300)
+            )
+    finally:
+        writer.close()
+
+
+async def load(port, requests, weights, data, args, duration, seed):
+    deadline = time.monotonic() + duration
+    results = defaultdict(list)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, requests, weights, data, deadline, results, seed + idx)
+        for idx in range(args.connections)
+    ))
+    return results, time.perf_counter() - started
+
+
+def summary(results, elapsed):
+    endpoints = []
+    for (scenario, label), samples in sorted(results.items()):
+        latencies = [latency for latency, _ in samples]
+        cuts = (
+            quantiles(latencies, n=100) if len(latencies) > 1
+            else latencies * 99
+        )
+        endpoints.append({
+            'scenario': scenario,
+            'endpoint': label,
+            'requests': len(samples),
+            'errors': sum(1 for _, ok in samples if not ok),
+            'rps': len(samples) / elapsed,
+            'p50_ms': cuts[49] * 1000,
+            'p95_ms': cuts[94] * 1000,
+            'p99_ms': cuts[98] * 1000,
+        })
+    return endpoints
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'), cwd=PROJECT_DIR,
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(endpoints, baseline=None):
+    baseline = {
+        (row['scenario'], row['endpoint']): row for row in baseline or ()
+    }
+    header = (f'{"сценарий":<13} {"запрос":<62} {"запр/с":>8} '
+              f'{"p50 мс":>8} {"p95 мс":>8} {"p99 мс":>8} {"ошибок":>7}')
+    if baseline:
+        header += f' {"Δ запр/с":>9} {"Δ p95":>8}'
+    print(header)
+    for row in endpoints:
+        line = (f'{row["scenario"]:<13} {row["endpoint"][:62]:<62} '
+                f'{row["rps"]:>8.1f} {row["p50_ms"]:>8.1f} '
+                f'{row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} '
+                f'{row["errors"]:>7}')
+        old = baseline.get((row['scenario'], row['endpoint']))
+        if old:
+            line += (f' {(row["rps"] / old["rps"] - 1) * 100:>+8.0f}%'
+                     f' {(row["p95_ms"] / old["p95_ms"] - 1) * 100:>+7.0f}%')
+        print(line)
+
+
+def parse_mix(value):
+    weights = {scenario: weight for scenario, (_, weight) in SCENARIOS.items()}
+    for part in filter(None, value.split(',')):
+        scenario, _, weight = part.partition('=')
+        if scenario not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f'Неизвестный сценарий {scenario}'
+            )
+        weights[scenario] = float(weight)
+    return {scenario: weight for scenario, weight in weights.items() if weight}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--server', default='wsgi',
+                        choices=('wsgi', 'asgi-sync', 'asgi'))
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(''),
+                        help='Веса сценариев, например '
+                             'title-browse=80,review-post=0.')
+    parser.add_argument('--connections', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Потоков в процессе gunicorn.')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--bench-users', type=int, default=200,
+                        help='Пользователей с токенами для публикации '
+                             'отзывов и получения токена.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--collection', default=COLLECTION)
+    parser.add_argument('--output', help='Файл JSON для результатов.')
+    parser.add_argument('--compare',
+                        help='Файл JSON прошлого запуска для сравнения.')
+    args = parser.parse_args()
+
+    requests = load_requests(args.collection)
+    with tempfile.TemporaryDirectory() as directory:
+        env, data = prepare(directory, args)
+        env['ASYNC_DB_WORKERS'] = str(args.threads)
+        port = free_port()
+        command, async_views = server_commands(port, args)[args.server]
+        server = subprocess.Popen(
+            command, cwd=PROJECT_DIR, env=dict(env, ASYNC_VIEWS=async_views)
+        )
+        try:
+            wait_for_port(port)
+            if args.warmup:
+                asyncio.run(load(port, requests, args.mix, data, args,
+                                 args.warmup, args.seed + 10 ** 6))
+            results, elapsed = asyncio.run(
+                load(port, requests, args.mix, data, args, args.duration,
+                     args.seed)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    endpoints = summary(results, elapsed)
+    total = sum(row['requests'] for row in endpoints)
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'settings': {
+            key: value for key, value in vars(args).items()
+            if key not in ('output', 'compare', 'collection')
+        },
+        'total_rps': total / elapsed,
+        'endpoints': endpoints,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        print(f'Сравнение с {baseline["commit"]} ({baseline["date"]})')
+    print_table(endpoints, baseline and baseline['endpoints'])
+    print(f'Всего: {report["total_rps"]:.1f} запросов/с')
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Микробенчмарки сериализаторов и запросов представлений.
+
+Запуск из корня репозитория:
+    python benchmarks/micro.py --output results/micro.json
+    python benchmarks/micro.py --baseline results/micro.json
+
+Для каждого размера данных (`--sizes`, количество произведений) база
+заполняется командой generate_data. Сериализаторы выводят все
+произведения, `size` отзывов, комментариев и пользователей; случаи
+title-page включают чтение произведений из БД, чтобы сравнить
+TitleListSerializer с TitleRowSerializer. Запросы
+представлений берут первую страницу списка и количество записей.
+
+Для каждого случая записываются время вызова (лучший из `--repeat`
+замеров по правилам timeit),
+память, оставшаяся занятой после вызова, и её пик по tracemalloc
+(не количество выделений), а также количество SQL-запросов. С
+`--baseline` запуск завершается с ошибкой, если время случая выросло
+больше, чем допускает файл порогов `micro_thresholds.json`, или
+выросло количество запросов.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import tracemalloc
+from io import StringIO
+from timeit import Timer
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from api.serializers import (  # noqa: E402
+    CommentSerializer, ReviewSerializer, TitleListSerializer,
+    TitleRowSerializer, UserForAdminSerializer, title_rows
+)
+from api.views import (  # noqa: E402
+    CommentsViewSet, ReviewsViewSet, TitleViewSet
+)
+from reviews.models import Comment, Review, Title  # noqa: E402
+
+
+User = get_user_model()
+
+THRESHOLDS = os.path.join(os.path.dirname(__file__), 'micro_thresholds.json')
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+
+def fill(size, seed):
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+    call_command(
+        'generate_data', users=size, titles=size, reviews=size * 10,
+        comments=size * 5, seed=seed, stdout=StringIO()
+    )
+
+
+def view_queryset(viewset, **kwargs):
+    view = viewset(kwargs=kwargs, action='list')
+    return view.get_queryset()
+
+
+def serializer_cases(size):
+    """Сериализаторы получают заранее загруженные объекты."""
+    titles = list(TitleViewSet.queryset.all())
+    reviews = list(Review.objects.select_related('author')[:size])
+    comments = list(Comment.objects.select_related('author')[:size])
+    users = list(User.objects.all()[:size])
+    return {
+        'serializer:TitleListSerializer': (
+            lambda: TitleListSerializer(titles, many=True).data, len(titles)
+        ),
+        # Быстрый вывод вместе с чтением строк и жанров из БД:
+        # сравнивать с title-page:TitleListSerializer.
+        'title-page:TitleListSerializer': (
+            lambda: TitleListSerializer(
+                TitleViewSet.queryset.all(), many=True
+            ).data,
+            len(titles)
+        ),
+        'title-page:TitleRowSerializer': (
+            lambda: TitleRowSerializer(
+                title_rows(TitleViewSet.queryset.all()), many=True
+            ).data,
+            len(titles)
+        ),
+        'serializer:ReviewSerializer': (
+            lambda: ReviewSerializer(reviews, many=True).data, len(reviews)
+        ),
+        'serializer:CommentSerializer': (
+            lambda: CommentSerializer(comments, many=True).data,
+            len(comments)
+        ),
+        'serializer:UserForAdminSerializer': (
+            lambda: UserForAdminSerializer(users, many=True).data,
+            len(users)
+        ),
+    }
+
+
+def page(queryset):
+    return queryset.count(), list(queryset[:PAGE_SIZE])
+
+
+def queryset_cases():
+    """Первая страница списка самого популярного произведения и отзыва."""
+    title = Title.objects.order_by('-rating_count').first()
+    review = (
+        Review.objects.filter(title=title)
+        .annotate(comment_count=Count('comments'))
+        .order_by('-comment_count')
+        .first()
+    )
+    cases = {
+        'queryset:TitleViewSet': (
+            lambda: page(view_queryset(TitleViewSet)), PAGE_SIZE
+        ),
+        'queryset:ReviewsViewSet': (
+            lambda: page(view_queryset(ReviewsViewSet, title_id=title.id)),
+            PAGE_SIZE
+        ),
+    }
+    if review:
+        cases['queryset:CommentsViewSet'] = (
+            lambda: page(view_queryset(
+                CommentsViewSet, title_id=title.id, review_id=review.id
+            )),
+            PAGE_SIZE
+        )
+    return cases
+
+
+def measure(func, repeat):
+    # Как timeit: в замере не меньше 0,2 с вызовов, сборщик мусора выключен.
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat, number)) / number
+    tracemalloc.start()
+    func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    return {
+        'seconds': seconds,
+        'retained_bytes': retained,
+        'peak_bytes': peak,
+        'queries': len(queries),
+    }
+
+
+def load_thresholds(path):
+    with open(path, encoding='utf-8') as file:
+        thresholds = json.load(file)
+    return thresholds['default_percent'], thresholds.get('cases', {})
+
+
+def threshold(case, default, cases):
+    for pattern, percent in cases.items():
+        if fnmatch.fnmatch(case, pattern):
+            return percent
+    return default
+
+
+def check(results, baseline, thresholds):
+    """Регрессии относительно прошлого запуска: список сообщений."""
+    default, cases = thresholds
+    old = {(row['case'], row['size']): row for row in baseline['results']}
+    failures = []
+    for row in results:
+        before = old.get((row['case'], row['size']))
+        if before is None:
+            continue
+        percent = threshold(row['case'], default, cases)
+        slowdown = (row['seconds'] / before['seconds'] - 1) * 100
+        if slowdown > percent:
+            failures.append(
+                f'{row["case"]} ({row["size"]}): медленнее на '
+                f'{slowdown:.0f}% при пороге {percent}%'
+            )
+        if row['queries'] > before['queries']:
+            failures.append(
+                f'{row["case"]} ({row["size"]}): запросов '
+                f'{row["queries"]} вместо {before["queries"]}'
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes', default='100,1000,5000',
+        type=lambda value: [int(size) for size in value.split(',')]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cases', default='*',
+                        help='Шаблон имён случаев, например serializer:*.')
+    parser.add_argument('--output', help='Файл JSON для результатов.')
+    parser.add_argument('--baseline',
+                        help='Файл JSON прошлого запуска для сравнения.')
+    parser.add_argument('--thresholds', default=THRESHOLDS)
+    args = parser.parse_args()
+
+    results = []
+    print(f'{"случай":<36} {"размер":>7} {"мс":>9} {"мкс/шт":>8} '
+          f'{"удерж. КиБ":>10} {"пик КиБ":>9} {"запросов":>8}')
+    # Журнал запросов при DEBUG замедлял бы замеры и переполнялся.
+    settings.DEBUG = False
+    test_db = connection.creation.create_test_db(verbosity=0)
+    try:
+        for size in args.sizes:
+            fill(size, args.seed)
+            cases = {**serializer_cases(size), **queryset_cases()}
+            for case, (func, items) in cases.items():
+                if not fnmatch.fnmatch(case, args.cases):
+                    continue
+                row = {'case': case, 'size': size, 'items': items,
+                       **measure(func, args.repeat)}
+                results.append(row)
+                print(f'{case:<36} {size:>7} {row["seconds"] * 1000:>9.2f} '
+                      f'{row["seconds"] / items * 1e6:>8.1f} '
+                      f'{row["retained_bytes"] / 1024:>10.0f} '
+                      f'{row["peak_bytes"] / 1024:>9.0f} '
+                      f'{row["queries"]:>8}')
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'results': results}, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        failures = check(results, baseline, load_thresholds(args.thresholds))
+        for failure in failures:
+            print(failure)
+        if failures:
+            sys.exit(1)
+        print('Регрессий нет')
+
+
+if __name__ == '__main__':
+    main()
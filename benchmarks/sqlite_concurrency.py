@@ -0,0 +1,149 @@
+"""
+Одновременные чтение и запись в SQLite с профилем sqlite-performance
+и без него.
+
+Запуск из корня репозитория:
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 2
+
+Для каждого профиля создаётся отдельная временная база данных,
+потому что режим журнала сохраняется в файле.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from time import perf_counter
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+
+from reviews.models import Comment, Review, Title  # noqa: E402
+
+
+User = get_user_model()
+
+PROFILES = {
+    'default': {},
+    'sqlite-performance': settings.SQLITE_PERFORMANCE_PRAGMAS,
+}
+
+
+def fill(titles, reviews_per_title):
+    User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@example.com')
+        for idx in range(reviews_per_title)
+    )
+    authors = list(User.objects.all())
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000)
+        for idx in range(titles)
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв', score=5)
+        for title in Title.objects.all()
+        for author in authors
+    )
+    return list(Title.objects.values_list('id', flat=True))
+
+
+def reader(title_ids, stop, stats):
+    idx = 0
+    while not stop.is_set():
+        title_id = title_ids[idx % len(title_ids)]
+        try:
+            list(
+                Review.objects.filter(title_id=title_id)
+                .select_related('author')[:10]
+            )
+            stats['reads'] += 1
+        except OperationalError:
+            stats['errors'] += 1
+        idx += 1
+    connections.close_all()
+
+
+def writer(review, stop, stats):
+    while not stop.is_set():
+        try:
+            Comment.objects.create(
+                review=review, title_id=review.title_id,
+                author_id=review.author_id, text='Комментарий'
+            )
+            stats['writes'] += 1
+        except OperationalError:
+            stats['errors'] += 1
+    connections.close_all()
+
+
+def run(profile, args, directory):
+    settings.SQLITE_PRAGMAS = PROFILES[profile]
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, f'{profile}.sqlite3'
+    )
+    test_db = connection.creation.create_test_db(verbosity=0)
+    try:
+        title_ids = fill(args.titles, args.reviews)
+        review = Review.objects.first()
+        connections.close_all()
+
+        stop = threading.Event()
+        stats = [
+            {'reads': 0, 'writes': 0, 'errors': 0}
+            for _ in range(args.readers + args.writers)
+        ]
+        threads = [
+            threading.Thread(target=reader, args=(title_ids, stop, stats[idx]))
+            for idx in range(args.readers)
+        ] + [
+            threading.Thread(
+                target=writer, args=(review, stop, stats[args.readers + idx])
+            )
+            for idx in range(args.writers)
+        ]
+        started = perf_counter()
+        for thread in threads:
+            thread.start()
+        stop.wait(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - started
+
+        reads = sum(item['reads'] for item in stats)
+        writes = sum(item['writes'] for item in stats)
+        errors = sum(item['errors'] for item in stats)
+        print(f'{profile:<20} {reads / elapsed:>10.0f} '
+              f'{writes / elapsed:>10.0f} {errors:>8}')
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f'{"профиль":<20} {"чтений/с":>10} {"записей/с":>10} '
+          f'{"ошибок":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in PROFILES:
+            run(profile, args, directory)
+
+
+if __name__ == '__main__':
+    main()
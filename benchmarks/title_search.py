@@ -0,0 +1,105 @@
+"""
+Сравнение полнотекстового поиска произведений с фильтром icontains.
+
+Запуск из корня репозитория:
+    python benchmarks/title_search.py --titles 1000000
+
+Данные создаются во временной тестовой базе данных.
+"""
+import argparse
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from reviews.models import Title  # noqa: E402
+from reviews.search import rebuild_search_index, search_titles  # noqa: E402
+
+
+WORDS = (
+    'побег', 'крепкий', 'орешек', 'терминатор', 'властелин', 'колец',
+    'звёздные', 'войны', 'мост', 'через', 'реку', 'хороший', 'плохой',
+    'злой', 'матрица', 'начало', 'интерстеллар', 'зелёная', 'миля',
+    'список', 'шиндлера', 'форрест', 'гамп', 'бойцовский', 'клуб',
+)
+VOCABULARY = WORDS + tuple(f'слово{idx}' for idx in range(5000))
+QUERIES = ('шиндлера', 'зелёная миля', 'клуб', 'терминатор войны')
+BATCH_SIZE = 10000
+
+
+def make_titles(count, seed):
+    rng = random.Random(seed)
+    for idx in range(1, count + 1):
+        yield Title(
+            id=idx,
+            name=' '.join(rng.choices(VOCABULARY, k=3)),
+            description=' '.join(rng.choices(VOCABULARY, k=12)),
+            year=rng.randint(1900, 2020),
+        )
+
+
+def fill(count, seed):
+    titles = make_titles(count, seed)
+    with transaction.atomic():
+        while True:
+            batch = [title for _, title in zip(range(BATCH_SIZE), titles)]
+            if not batch:
+                break
+            Title.objects.bulk_create(batch)
+        rebuild_search_index()
+
+
+def measure(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        total = queryset.count()
+        list(queryset[:10])
+        timings.append(perf_counter() - started)
+    return min(timings), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    test_db = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = perf_counter()
+        fill(args.titles, args.seed)
+        print(f'{args.titles} произведений созданы за '
+              f'{perf_counter() - started:.1f} с')
+        print(f'{"запрос":<20} {"icontains":>10} {"мс":>8} '
+              f'{"fts5":>10} {"мс":>8}')
+        for query in QUERIES:
+            # search_titles без FTS5 откатывается на icontains.
+            connection.title_search_available = False
+            like_time, like_total = measure(
+                search_titles(Title.objects.all(), query), args.repeat
+            )
+            connection.title_search_available = True
+            fts_time, fts_total = measure(
+                search_titles(Title.objects.all(), query), args.repeat
+            )
+            print(f'{query:<20} {like_total:>10} {like_time * 1000:>8.1f} '
+                  f'{fts_total:>10} {fts_time * 1000:>8.1f}')
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """База данных очищается между тестами без сигналов моделей."""
+    cache.clear()
+    yield
+    cache.clear()
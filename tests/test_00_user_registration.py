@@ -1,13 +1,20 @@
 from http import HTTPStatus
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
 
 import pytest
 from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
 from django.db.utils import IntegrityError
+from django.utils import timezone
 
 from tests.utils import (
     invalid_data_for_user_patch_and_creation,
     invalid_data_for_username_and_email_fields
 )
+from users.models import OutgoingEmail
+from users.outbox import claim_emails, enqueue_email, send_pending_emails
 
 
 @pytest.mark.django_db(transaction=True)
@@ -112,6 +119,11 @@ class Test00UserRegistration:
         }
 
         response = client.post(self.URL_SIGNUP, data=valid_data)
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что эндпоинт `{self.URL_SIGNUP}` не отправляет '
+            'письмо в процессе запроса, а ставит его в очередь.'
+        )
+        call_command('send_emails', stdout=StringIO())
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -375,3 +387,55 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+
+class UnavailableBackend(locmem.EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class RejectingBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise SMTPRecipientsRefused({})
+
+
+@pytest.mark.django_db(transaction=True)
+class Test00Outbox:
+
+    def test_00_unavailable_smtp_defers_batch(self):
+        mail.outbox.clear()
+        email = enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        assert send_pending_emails(connection=UnavailableBackend()) == 0
+        email.refresh_from_db()
+        assert email.attempts == 1 and 'SMTP недоступен' in email.error, (
+            'Ошибка соединения должна записываться в письма пачки.'
+        )
+        assert email.next_attempt_at > timezone.now() and not email.claim, (
+            'После ошибки письмо должно вернуться в очередь с паузой.'
+        )
+        assert send_pending_emails() == 0 and not mail.outbox, (
+            'Письмо не должно отправляться повторно до окончания паузы.'
+        )
+
+    def test_00_failed_email_backoff_grows(self):
+        email = enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        delays = []
+        for _ in range(2):
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+            started = timezone.now()
+            assert send_pending_emails(connection=RejectingBackend()) == 0
+            email.refresh_from_db()
+            delays.append(email.next_attempt_at - started)
+        assert email.attempts == 2
+        assert delays[1] > delays[0] * 1.5, (
+            'Пауза перед повтором должна расти с каждой попыткой.'
+        )
+
+    def test_00_claimed_emails_are_skipped(self):
+        email = enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        mail.outbox.clear()
+        assert claim_emails(10) == [email]
+        assert claim_emails(10) == [], (
+            'Захваченные письма не должны выбираться другим обработчиком.'
+        )
+        assert send_pending_emails() == 0 and not mail.outbox
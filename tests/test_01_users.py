@@ -564,3 +564,71 @@ class Test01UserAPI:
             f'Проверьте, что PATCH-запрос к `{self.USERS_ME_URL}` с ключом '
             '`role` не изменяет роль пользователя.'
         )
+
+    def test_11_01_cached_user_authentication(self, admin_client, admin,
+                                           django_assert_num_queries):
+        admin_client.get(self.USERS_ME_URL)
+        with django_assert_num_queries(1):
+            response = admin_client.get(self.USERS_URL, {'search': 'nobody'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос администратора к '
+            f'`{self.USERS_URL}` не загружает пользователя из базы данных.'
+        )
+
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены роли администратора его запрос к '
+            f'`{self.USERS_URL}` возвращает ответ со статусом 403.'
+        )
+
+    def test_11_02_cached_user_revoked_in_other_process(self, admin_client,
+                                                     admin):
+        from django.core.cache import cache
+
+        from api.authentication import ROLE_REVOCATIONS_KEY, user_cache_key
+
+        admin_client.get(self.USERS_ME_URL)
+        state = cache.get(user_cache_key(admin.pk))
+        admin.role = 'user'
+        admin.save()
+        # Другой процесс: кеш пользователя не очищен сигналом,
+        # а список смен ролей перечитан из БД по истечении срока.
+        cache.set(user_cache_key(admin.pk), state)
+        cache.delete(ROLE_REVOCATIONS_KEY)
+        response = admin_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что данные пользователя из кеша, сохранённые до '
+            'смены роли, не используются для проверки прав.'
+        )
+
+    def test_12_role_claims_in_token(self, admin, settings,
+                                     django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        from api.authentication import make_access_token
+
+        settings.TOKEN_ROLE_CLAIMS = True
+        token = make_access_token(admin)
+        assert token['role'] == admin.role, (
+            'Проверьте, что при включённой настройке `TOKEN_ROLE_CLAIMS` '
+            'токен содержит роль пользователя.'
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        client.get(self.USERS_URL)
+        with django_assert_num_queries(1):
+            response = client.get(self.USERS_URL, {'search': 'nobody'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что права администратора с ролью в токене '
+            'проверяются без загрузки пользователя из базы данных.'
+        )
+
+        admin.role = 'user'
+        admin.save()
+        response = client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены роли токен с ролью администратора '
+            f'не даёт доступа к `{self.USERS_URL}`.'
+        )
@@ -153,3 +153,66 @@ class Test02CategoryAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, self.CATEGORY_URL, data,
                           'модератора', categories, HTTPStatus.FORBIDDEN)
+
+    def test_06_category_list_cache(self, client, admin_client,
+                                    django_assert_num_queries):
+        create_categories(admin_client)
+        response = client.get(self.CATEGORY_URL)
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{self.CATEGORY_URL}` '
+            'содержит заголовок `ETag`.'
+        )
+
+        with django_assert_num_queries(0):
+            response = admin_client.get(
+                self.CATEGORY_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{self.CATEGORY_URL}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304 без '
+            'обращения к базе данных.'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORY_URL)
+        check_pagination(self.CATEGORY_URL, response.json(), 2)
+        response = client.get(
+            self.CATEGORY_URL, HTTP_AUTHORIZATION='Bearer invalid'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что GET-запрос к `{self.CATEGORY_URL}` '
+            'с недействительным токеном возвращает ответ со статусом 401, '
+            'даже если список есть в кеше.'
+        )
+
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORY_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после создания категории кеш списка '
+            f'`{self.CATEGORY_URL}` сбрасывается.'
+        )
+        check_pagination(self.CATEGORY_URL, response.json(), 3)
+
+        admin_client.delete(
+            self.CATEGORY_SLUG_TEMPLATE_URL.format(slug='music')
+        )
+        check_pagination(
+            self.CATEGORY_URL, client.get(self.CATEGORY_URL).json(), 2
+        )
+
+    def test_07_category_list_cache_expires(self, client, admin_client,
+                                            monkeypatch):
+        from reviews.models import Category
+
+        monkeypatch.setattr('reviews.cache.LIST_CACHE_TIMEOUT', 0)
+        create_categories(admin_client)
+        etag = client.get(self.CATEGORY_URL)['ETag']
+        # Запись из другого процесса не меняет версию в локальном кеше.
+        Category.objects.filter(slug='films').update(name='Кино')
+        response = client.get(self.CATEGORY_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после истечения кеша списка '
+            f'`{self.CATEGORY_URL}` ETag строится по новым данным.'
+        )
@@ -1,10 +1,12 @@
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
 
 from tests.utils import (
     check_pagination, check_permissions, create_categories, create_genre,
-    create_titles
+    create_single_review, create_titles
 )
 
 
@@ -13,6 +15,7 @@ class Test04TitleAPI:
 
     TITLES_URL = '/api/v1/titles/'
     TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    TITLES_TOP_URL = '/api/v1/titles/top/'
 
     def test_01_title_not_auth(self, client):
         response = client.get(self.TITLES_URL)
@@ -353,3 +356,256 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_titles_list_queries_count(self, client,
+                                          django_assert_num_queries):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name='Ужасы', slug='horror'),
+            Genre.objects.create(name='Комедия', slug='comedy'),
+        ]
+        for idx in range(15):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+
+        # COUNT для пагинации, произведения с категориями и жанры.
+        for page in (1, 2):
+            with django_assert_num_queries(3):
+                response = client.get(self.TITLES_URL, {'page': page})
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что GET-запрос неавторизованного пользователя к '
+                f'`{self.TITLES_URL}` возвращает ответ со статусом 200.'
+            )
+            assert all(
+                len(title['genre']) == len(genres)
+                for title in response.json()['results']
+            ), (
+                f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+                'содержит жанры каждого произведения.'
+            )
+
+    def test_08_titles_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Орешки', year=2000, description='Крепкий орешек. Крепкий.'
+        )
+
+        response = client.get(self.TITLES_URL, {'search': 'терминат'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'ищет произведения по началу слова в названии.'
+        )
+
+        data = client.get(self.TITLES_URL, {'search': 'крепкий'}).json()
+        check_pagination(self.TITLES_URL, data, 2)
+        assert data['results'][0]['name'] == 'Орешки', (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'ищет по описанию и упорядочивает результаты по релевантности.'
+        )
+
+        response = admin_client.delete(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        data = client.get(self.TITLES_URL, {'search': 'терминатор'}).json()
+        assert data['results'] == [], (
+            'Проверьте, что удалённое произведение не находится через '
+            f'параметр `search` эндпоинта `{self.TITLES_URL}`.'
+        )
+
+    def test_09_titles_top(self, client, admin_client, user_client,
+                           moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        create_single_review(admin_client, terminator, 'Отлично', 10)
+        create_single_review(user_client, terminator, 'Хорошо', 8)
+        create_single_review(admin_client, die_hard, 'Отлично', 10)
+
+        def top_ids(**params):
+            response = client.get(self.TITLES_TOP_URL, params)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{self.TITLES_TOP_URL}` '
+                'возвращает ответ со статусом 200.'
+            )
+            return [title['id'] for title in response.json()]
+
+        assert top_ids() == [terminator, die_hard], (
+            f'Проверьте, что `{self.TITLES_TOP_URL}` упорядочивает '
+            'произведения по байесовскому рейтингу: много высоких оценок '
+            'важнее одной максимальной.'
+        )
+        assert top_ids(genre='drama') == [die_hard], (
+            f'Проверьте, что `{self.TITLES_TOP_URL}` фильтрует по жанру.'
+        )
+        assert top_ids(category='films') == [terminator], (
+            f'Проверьте, что `{self.TITLES_TOP_URL}` фильтрует по категории.'
+        )
+        assert top_ids(min_reviews=2) == [terminator]
+        assert top_ids(limit=1) == [terminator]
+
+        create_single_review(moderator_client, die_hard, 'Шедевр', 10)
+        assert top_ids() == [die_hard, terminator], (
+            'Проверьте, что рейтинг лучших произведений обновляется '
+            'при добавлении отзыва.'
+        )
+
+        from reviews.constants import LEADERBOARD_PRIOR_WEIGHT
+        from reviews.models import RatingPrior, Title
+
+        call_command('rebuild_ratings', stdout=StringIO())
+        # Среднее, которое другой процесс сохранил в БД.
+        RatingPrior.objects.filter(pk=1).update(mean=2)
+        create_single_review(user_client, die_hard, 'Неплохо', 6)
+        weight = LEADERBOARD_PRIOR_WEIGHT
+        assert Title.objects.get(pk=die_hard).rank_score == pytest.approx(
+            (26 + weight * 2) / (3 + weight)
+        ), (
+            'Проверьте, что байесовский рейтинг считается со средней '
+            'оценкой, сохранённой в базе данных.'
+        )
+
+        response = client.get(self.TITLES_TOP_URL, {'limit': 1000})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{self.TITLES_TOP_URL}` ограничивает `limit`.'
+        )
+
+    def test_10_titles_fast_output_matches_serializer(self, client,
+                                                      admin_client,
+                                                      user_client):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.serializers import TitleListSerializer
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 7)
+        Title.objects.filter(pk=titles[1]['id']).update(category=None)
+        Title.genre.through.objects.filter(title_id=titles[1]['id']).delete()
+
+        queryset = Title.objects.select_related(
+            'category'
+        ).prefetch_related('genre')
+        response = client.get(self.TITLES_URL)
+        expected = JSONRenderer().render(
+            TitleListSerializer(queryset, many=True).data
+        )
+        results = response.content.split(b'"results":', 1)[1][:-1]
+        assert results == expected, (
+            f'Проверьте, что список `{self.TITLES_URL}` совпадает байт в '
+            'байт с выводом `TitleListSerializer`.'
+        )
+        for title in titles:
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title['id'])
+            )
+            assert response.content == JSONRenderer().render(
+                TitleListSerializer(queryset.get(pk=title['id'])).data
+            ), (
+                f'Проверьте, что `{self.TITLES_DETAIL_URL_TEMPLATE}` '
+                'совпадает байт в байт с выводом `TitleListSerializer`.'
+            )
+
+    def test_11_titles_write_response_queries(self, admin_client,
+                                              user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, categories, genres = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 7)
+
+        def genre_and_review_reads(queries):
+            return [
+                query['sql'] for query in queries
+                if query['sql'].startswith('SELECT')
+                and ('"reviews_genre"."name"' in query['sql']
+                     or 'FROM "reviews_review"' in query['sql'])
+            ]
+
+        data = {
+            'name': 'Поймай меня',
+            'year': 2002,
+            'genre': [genres[0]['slug'], genres[2]['slug']],
+            'category': categories[0]['slug'],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(genre_and_review_reads(queries)) == len(data['genre']), (
+            'Проверьте, что ответ на создание произведения строится из '
+            'сохранённого объекта без повторного чтения жанров и отзывов.'
+        )
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=response.json()['id']
+        )
+        assert response.json() == admin_client.get(detail_url).json()
+
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.patch(detail_url, data={'name': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        # Жанры загружаются вместе с произведением через prefetch_related.
+        assert len(genre_and_review_reads(queries)) == 1, (
+            'Проверьте, что ответ на изменение произведения берёт жанры '
+            'и рейтинг из уже загруженного объекта.'
+        )
+        assert response.json() == admin_client.get(detail_url).json()
+        assert response.json()['rating'] == 7
+
+    def test_12_title_validators_follow_category_and_genre(self,
+                                                           admin_client,
+                                                           client):
+        titles, categories, genres = create_titles(admin_client)
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        changes = (
+            ('удаления категории', lambda: admin_client.delete(
+                f'/api/v1/categories/{categories[0]["slug"]}/'
+            )),
+            ('удаления жанра', lambda: admin_client.delete(
+                f'/api/v1/genres/{genres[0]["slug"]}/'
+            )),
+        )
+        for change, action in changes:
+            urls = (self.TITLES_URL, detail_url)
+            etags = [client.get(url)['ETag'] for url in urls]
+            action()
+            for url, etag in zip(urls, etags):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                assert response.status_code == HTTPStatus.OK, (
+                    f'Проверьте, что после {change} GET-запрос к `{url}` '
+                    'со старым `If-None-Match` возвращает новые данные.'
+                )
+        assert client.get(detail_url).json()['category'] is None
+
+        from reviews.models import Genre, Title
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        etag = client.get(detail_url)['ETag']
+        Genre.objects.get(slug=genres[2]['slug']).genres.add(title)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров произведения меняет его ETag.'
+        )
+
+    def test_13_titles_ignore_page_size(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, {'page_size': 1})
+        assert len(response.json()['results']) == 2, (
+            f'Проверьте, что размер страницы `{self.TITLES_URL}` нельзя '
+            'изменить параметром `page_size`.'
+        )
@@ -1,6 +1,9 @@
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
+from django.db import models
 from django.db.utils import IntegrityError
 
 from tests.utils import (
@@ -17,6 +20,7 @@ class Test05ReviewAPI:
     REVIEW_DETAIL_URL_TEMPLATE = (
         '/api/v1/titles/{title_id}/reviews/{review_id}/'
     )
+    TITLE_STATS_URL_TEMPLATE = '/api/v1/titles/{title_id}/stats/'
 
     def test_01_review_not_auth(self, client, admin_client, admin, user_client,
                                 user, moderator_client, moderator):
@@ -413,3 +417,374 @@ class Test05ReviewAPI:
             f'Проверьте, что PUT-запрос к `{self.REVIEW_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_review_rating_is_maintained(self, admin_client, admin,
+                                            user_client, user):
+        author_map = {
+            admin: admin_client,
+            user: user_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            data={'score': 1}
+        )
+        assert admin_client.get(title_url).json().get('rating') == 3, (
+            'Проверьте, что после изменения оценки в отзыве рейтинг '
+            f'произведения в ответе на GET-запрос к `{title_url}` '
+            'пересчитывается.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+        )
+        assert admin_client.get(title_url).json().get('rating') == 1, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            f'в ответе на GET-запрос к `{title_url}` пересчитывается.'
+        )
+
+        from reviews.models import Title
+
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert admin_client.get(title_url).json().get('rating') == 1, (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'рейтинг произведения по отзывам.'
+        )
+
+        stale = Title.objects.get(pk=titles[0]['id'])
+        admin_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'text': 'Ещё отзыв', 'score': 9}
+        )
+        stale.name = 'Новое название'
+        stale.save()
+        assert admin_client.get(title_url).json().get('rating') == 5, (
+            'Проверьте, что сохранение произведения не перезаписывает '
+            'счётчики оценок, изменённые новыми отзывами.'
+        )
+
+    def test_08_reviews_cursor_pagination(self, client, admin_client,
+                                          django_user_model):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        for idx in range(15):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title_id=titles[0]['id'],
+                text=f'review number {idx}', score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+            'с параметром `pagination=cursor` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data and data.get('next'), (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+            'с параметром `pagination=cursor` использует курсорную '
+            'пагинацию.'
+        )
+        texts = [review['text'] for review in data['results']]
+        data = client.get(data['next']).json()
+        texts += [review['text'] for review in data['results']]
+        assert texts == [f'review number {idx}' for idx in range(15)], (
+            'Проверьте, что курсорная пагинация отзывов возвращает все '
+            'отзывы в порядке публикации.'
+        )
+
+        response = client.get(
+            url, HTTP_ACCEPT='application/json; pagination=cursor'
+        )
+        assert 'count' not in response.json(), (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+            'с заголовком `Accept: application/json; pagination=cursor` '
+            'использует курсорную пагинацию.'
+        )
+        assert client.get(url).json().get('count') == 15, (
+            f'Проверьте, что по умолчанию `{self.REVIEWS_URL_TEMPLATE}` '
+            'использует постраничную пагинацию.'
+        )
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        Review.objects.update(pub_date=Review.objects.first().pub_date)
+        data = client.get(url, {'pagination': 'cursor', 'page_size': 4}).json()
+        texts = [review['text'] for review in data['results']]
+        with CaptureQueriesContext(connection) as queries:
+            while data['next']:
+                data = client.get(data['next']).json()
+                texts += [review['text'] for review in data['results']]
+        assert texts == [f'review number {idx}' for idx in range(15)], (
+            'Проверьте, что курсорная пагинация отзывов с одинаковой датой '
+            'публикации возвращает все отзывы по порядку.'
+        )
+        assert not any('OFFSET' in query['sql'] for query in queries), (
+            'Проверьте, что курсор отзывов с одинаковой датой публикации '
+            'строится по паре (`pub_date`, `id`), а не по смещению.'
+        )
+        texts = []
+        while data['previous']:
+            data = client.get(data['previous']).json()
+            texts = [review['text'] for review in data['results']] + texts
+        assert texts == [f'review number {idx}' for idx in range(12)], (
+            'Проверьте, что курсорная пагинация отзывов возвращается '
+            'по ссылкам `previous` к первой странице.'
+        )
+
+    def test_09_reviews_conditional_get(self, client, admin_client, admin,
+                                        user_client, user):
+        author_map = {
+            admin: admin_client,
+            user: user_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        urls = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+        )
+        validators = {}
+        for url in urls:
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert etag and response.get('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовки `ETag` и `Last-Modified`.'
+            )
+            validators[url] = etag
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-Modified-Since` возвращает ответ со статусом 304.'
+            )
+
+        user_client.patch(urls[1], data={'score': 1})
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=validators[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+                'с устаревшим `If-None-Match` возвращает новые данные.'
+            )
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = f'{urls[0]}?pagination=cursor'
+        with CaptureQueriesContext(connection) as queries:
+            etag = client.get(url)['ETag']
+        assert not any(
+            'COUNT(' in query['sql'] or 'MAX(' in query['sql']
+            for query in queries
+        ), (
+            'Проверьте, что в курсорном режиме ETag списка отзывов строится '
+            'без подсчёта всех отзывов произведения.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        admin_client.delete(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        ))
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление отзыва меняет ETag курсорной страницы.'
+        )
+
+        validators = {url: client.get(url)['ETag'] for url in urls[:2]}
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        for url in urls[:2]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=validators[url])
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что после смены имени автора GET-запрос к '
+                f'`{url}` с устаревшим `If-None-Match` возвращает новые '
+                'данные.'
+            )
+
+    @pytest.mark.parametrize('page_size', (10, 100, 1000))
+    def test_10_reviews_list_queries_count(self, client, admin_client,
+                                           django_user_model, page_size,
+                                           django_assert_num_queries):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            for idx in range(page_size)
+        )
+        Review.objects.bulk_create(
+            Review(author=author, title_id=titles[0]['id'],
+                   text='review', score=5)
+            for author in django_user_model.objects.filter(
+                username__startswith='reviewer'
+            )
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        # Произведение, COUNT и MAX(updated_at), отзывы вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url, {'page_size': page_size})
+        assert len(response.json()['results']) == page_size, (
+            f'Проверьте, что `{self.REVIEWS_URL_TEMPLATE}` поддерживает '
+            'параметр `page_size`.'
+        )
+        assert all(
+            review['author'].startswith('reviewer')
+            for review in response.json()['results']
+        ), (
+            f'Проверьте, что ответ на GET-запрос к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` содержит авторов отзывов.'
+        )
+
+    def test_11_title_score_stats(self, client, admin_client, user_client,
+                                  moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_STATS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.TITLE_STATS_URL_TEMPLATE}` не найден или '
+            'недоступен.'
+        )
+        assert response.json()['count'] == 0
+        assert response.json()['mean'] is None
+
+        create_single_review(admin_client, titles[0]['id'], 'Так себе', 4)
+        user_review = create_single_review(
+            user_client, titles[0]['id'], 'Отлично', 10
+        ).json()
+        review = create_single_review(
+            moderator_client, titles[0]['id'], 'Неплохо', 6
+        ).json()
+        moderator_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=review['id']
+            ),
+            data={'score': 7}
+        )
+
+        data = client.get(url).json()
+        expected_histogram = {str(score): 0 for score in range(1, 11)}
+        expected_histogram.update({'4': 1, '7': 1, '10': 1})
+        assert data['histogram'] == expected_histogram, (
+            f'Проверьте, что `{self.TITLE_STATS_URL_TEMPLATE}` возвращает '
+            'количество отзывов с каждой оценкой от 1 до 10.'
+        )
+        assert data['count'] == 3
+        assert data['mean'] == 7
+        assert data['median'] == 7
+        assert data['stddev'] == pytest.approx(6 ** 0.5), (
+            f'Проверьте, что `{self.TITLE_STATS_URL_TEMPLATE}` возвращает '
+            'среднее, медиану и стандартное отклонение оценок.'
+        )
+
+        from reviews.models import ScoreHistogram
+
+        ScoreHistogram.objects.update(score_4=0, score_7=0)
+        call_command('rebuild_score_histograms', stdout=StringIO())
+        assert client.get(url).json()['histogram'] == expected_histogram, (
+            'Проверьте, что команда `rebuild_score_histograms` '
+            'восстанавливает гистограмму оценок по отзывам.'
+        )
+
+        ScoreHistogram.objects.all().delete()
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.TITLE_STATS_URL_TEMPLATE}` отвечает '
+            'для произведения без сохранённой гистограммы.'
+        )
+        assert response.json()['histogram'] == expected_histogram
+        assert not ScoreHistogram.objects.exists(), (
+            f'Проверьте, что GET-запрос к `{self.TITLE_STATS_URL_TEMPLATE}` '
+            'не сохраняет гистограмму: чтение может идти из реплики.'
+        )
+        moderator_client.delete(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review['id']
+        ))
+        assert client.get(url).json()['count'] == 2
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=user_review['id']
+            ),
+            data={'score': 9}
+        )
+        assert ScoreHistogram.objects.get().counts == [
+            0, 0, 0, 1, 0, 0, 0, 0, 1, 0
+        ], (
+            'Проверьте, что изменение отзыва сохраняет гистограмму '
+            'произведения, у которого её ещё не было.'
+        )
+        assert client.get(
+            self.TITLE_STATS_URL_TEMPLATE.format(title_id=999)
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_12_generate_data(self, client, workers):
+        from reviews.models import Comment, Review, ScoreHistogram, Title
+
+        options = dict(
+            users=20, categories=2, genres=3, titles=15, reviews=120,
+            comments=40, seed=7, batch_size=50, workers=workers,
+            stdout=StringIO()
+        )
+        call_command('generate_data', **options)
+        assert Title.objects.count() == 15
+        assert Review.objects.count() == 120, (
+            'Проверьте, что команда `generate_data` создаёт заданное '
+            'количество отзывов.'
+        )
+        assert Comment.objects.count() == 40
+        assert Comment.objects.exclude(
+            review__title=models.F('title')
+        ).count() == 0
+        counts = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True
+        )
+        assert counts[0] > counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределены по произведениям неравномерно.'
+        )
+        assert sum(counts) == 120, (
+            'Проверьте, что после генерации пересчитываются рейтинги.'
+        )
+        assert ScoreHistogram.objects.count() == 15
+        top = Title.objects.order_by('-rating_count', 'id').first()
+        response = client.get(
+            self.TITLE_STATS_URL_TEMPLATE.format(title_id=top.id)
+        )
+        assert response.json()['count'] == top.rating_count
+
+        first = list(Review.objects.values_list(
+            'author_id', 'text', 'score'
+        ).order_by('id'))
+        call_command('generate_data', **options)
+        second = list(Review.objects.values_list(
+            'author_id', 'text', 'score'
+        ).order_by('id')[120:])
+        assert [row[1:] for row in first] == [row[1:] for row in second], (
+            'Проверьте, что одинаковое зерно даёт одинаковые данные.'
+        )
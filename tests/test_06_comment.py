@@ -366,3 +366,69 @@ class Test06CommentAPI:
             f'Проверьте, что PUT-запрос к `{self.COMMENT_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_08_comment_create_queries_count(
+            self, admin_client, admin, user_client, user,
+            django_assert_max_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        # Пользователь, отзыв вместе с произведением и вставка комментария.
+        with django_assert_max_num_queries(3):
+            response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Если POST-запрос авторизованного пользователя к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` содержит корректные данные - '
+            'должен вернуться ответ со статусом 201.'
+        )
+        response = user_client.post(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[1]['id'], review_id=reviews[0]['id']
+            ),
+            data={'text': 'Не тот отзыв'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что POST-запрос к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` с отзывом другого произведения '
+            'возвращает ответ со статусом 404.'
+        )
+
+    @pytest.mark.parametrize('page_size', (10, 100, 1000))
+    def test_09_comments_list_queries_count(
+            self, client, admin_client, admin, user_client, user,
+            django_user_model, page_size, django_assert_num_queries):
+        from reviews.models import Comment
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'commenter{idx}',
+                email=f'commenter{idx}@yamdb.fake'
+            )
+            for idx in range(page_size)
+        )
+        Comment.objects.bulk_create(
+            Comment(author=author, title_id=titles[0]['id'],
+                    review_id=reviews[0]['id'], text='comment')
+            for author in django_user_model.objects.filter(
+                username__startswith='commenter'
+            )
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+
+        # Отзыв, COUNT и MAX(updated_at), комментарии вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url, {'page_size': page_size})
+        assert len(response.json()['results']) == page_size, (
+            f'Проверьте, что `{self.COMMENTS_URL_TEMPLATE}` поддерживает '
+            'параметр `page_size`.'
+        )
@@ -0,0 +1,101 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08QueryInstrumentation:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/api/metrics/'
+
+    def test_01_server_timing_header(self, client, settings, caplog,
+                                     monkeypatch):
+        settings.QUERY_INSTRUMENTATION = True
+        monkeypatch.setattr(logging.getLogger('api.queries'), 'propagate',
+                            True)
+        with caplog.at_level(logging.INFO, logger='api.queries'):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' in response, (
+            'Проверьте, что при включённой настройке '
+            '`QUERY_INSTRUMENTATION` ответ содержит заголовок '
+            '`Server-Timing`.'
+        )
+        assert 'desc="1 queries"' in response['Server-Timing'], (
+            'Проверьте, что заголовок `Server-Timing` содержит количество '
+            'SQL-запросов.'
+        )
+        records = [
+            record for record in caplog.records
+            if record.name == 'api.queries'
+        ]
+        assert records and records[-1].url_name == 'title-list', (
+            'Проверьте, что статистика запросов пишется в лог `api.queries` '
+            'с именем маршрута.'
+        )
+
+    def test_02_server_timing_header_async(self, async_rf, settings):
+        from asgiref.sync import async_to_sync
+
+        from api.async_views import async_view
+        from api.middleware import QueryInstrumentationMiddleware
+        from api.views import TitleViewSet
+
+        settings.QUERY_INSTRUMENTATION = True
+        middleware = QueryInstrumentationMiddleware(
+            async_view(TitleViewSet.as_view({'get': 'list'}))
+        )
+        response = async_to_sync(middleware)(async_rf.get(self.TITLES_URL))
+        assert response.status_code == HTTPStatus.OK
+        assert 'desc="1 queries"' in response['Server-Timing'], (
+            'Проверьте, что под ASGI учитываются SQL-запросы, выполненные '
+            'в потоках асинхронных представлений.'
+        )
+
+    def test_03_disabled(self, client, settings):
+        settings.QUERY_INSTRUMENTATION = False
+        response = client.get(self.TITLES_URL)
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что при выключенной настройке '
+            '`QUERY_INSTRUMENTATION` заголовок `Server-Timing` не '
+            'добавляется.'
+        )
+
+    def test_04_metrics_endpoint(self, client, admin_client, settings):
+        from django.test import Client
+
+        assert Client().get(self.METRICS_URL).status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            f'Проверьте, что эндпоинт `{self.METRICS_URL}` по умолчанию '
+            'выключен.'
+        )
+        settings.METRICS = True
+        client.get(self.TITLES_URL)
+        admin_client.post(self.TITLES_URL, data={})
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.METRICS_URL}` не найден или недоступен.'
+        )
+        content = response.content.decode()
+        expected = (
+            'api_request_duration_seconds_count{view="TitleViewSet.list"}',
+            'api_responses_total{view="TitleViewSet.create",status="400"}',
+            'api_requests_in_flight{view="TitleViewSet.list"} 0',
+        )
+        for line in expected:
+            assert line in content, (
+                f'Проверьте, что ответ `{self.METRICS_URL}` содержит '
+                f'метрику `{line}`.'
+            )
+        assert 'view="metrics"' not in content, (
+            f'Запросы к `{self.METRICS_URL}` не должны учитываться в '
+            'метриках.'
+        )
+        response = client.get(self.METRICS_URL, REMOTE_ADDR='203.0.113.1')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.METRICS_URL}` недоступен с адресов '
+            'вне `METRICS_ALLOWED_IPS`.'
+        )
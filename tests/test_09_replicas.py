@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb import routers
+from reviews.models import Category
+
+
+@pytest.fixture
+def replica_reads(settings, monkeypatch):
+    """Единственная «реплика» — основная база, запоминает каждое чтение."""
+    settings.DATABASE_REPLICAS = ['default']
+    reads = []
+    db_for_read = routers.ReplicaRouter.db_for_read
+
+    def spy(router, model, **hints):
+        reads.append(routers._replica.get() is not None)
+        return db_for_read(router, model, **hints)
+
+    monkeypatch.setattr(routers.ReplicaRouter, 'db_for_read', spy)
+    return reads
+
+
+class Test09ReadReplicas:
+
+    CATEGORY_URL = '/api/v1/categories/'
+
+    def test_01_router(self, settings):
+        settings.DATABASE_REPLICAS = ['replica1', 'replica2']
+        router = routers.ReplicaRouter()
+        assert router.db_for_read(Category) == 'default', (
+            'Проверьте, что вне `read_from_replicas` чтение идёт '
+            'из основной базы данных.'
+        )
+        blocks = []
+        for _ in range(4):
+            with routers.read_from_replicas():
+                blocks.append({router.db_for_read(Category) for _ in range(3)})
+                assert router.db_for_write(Category) == 'default', (
+                    'Проверьте, что запись всегда идёт в основную базу '
+                    'данных.'
+                )
+        assert all(len(aliases) == 1 for aliases in blocks), (
+            'Проверьте, что все чтения одного запроса идут в одну реплику.'
+        )
+        assert set.union(*blocks) == {'replica1', 'replica2'}, (
+            'Проверьте, что запросы распределяются по всем репликам.'
+        )
+        with routers.read_from_replicas(allowed=False):
+            assert router.db_for_read(Category) == 'default'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_safe_requests_read_replicas(self, client, replica_reads,
+                                            settings):
+        response = client.get(self.CATEGORY_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert replica_reads and all(replica_reads), (
+            'Проверьте, что GET-запросы читают из реплик.'
+        )
+        assert settings.REPLICA_PIN_COOKIE not in response.cookies, (
+            'Проверьте, что чтение не закрепляет клиента '
+            'за основной базой данных.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_read_your_writes(self, admin_client, replica_reads,
+                                 settings):
+        response = admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Фильмы', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(replica_reads), (
+            'Проверьте, что запрос на запись читает из основной базы данных.'
+        )
+        cookie = response.cookies.get(settings.REPLICA_PIN_COOKIE)
+        assert cookie and cookie['max-age'] == settings.REPLICA_PIN_SECONDS, (
+            'Проверьте, что после записи клиенту устанавливается cookie, '
+            'закрепляющее чтение за основной базой данных.'
+        )
+
+        replica_reads.clear()
+        response = admin_client.get(self.CATEGORY_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert replica_reads and not any(replica_reads), (
+            'Проверьте, что клиент с cookie недавней записи читает '
+            'из основной базы данных.'
+        )
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api.async_views import async_view
+from api.metrics import registry
+from api.views import TitleViewSet
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10AsyncViews:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_async_view_matches_sync(self, client, async_rf):
+        category = Category.objects.create(name='Фильмы', slug='films')
+        Title.objects.create(name='Поезд', year=1896, category=category)
+        expected = client.get(self.TITLES_URL)
+
+        view = async_view(TitleViewSet.as_view({'get': 'list'}))
+        response = async_to_sync(view)(async_rf.get(self.TITLES_URL))
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == expected.content, (
+            'Проверьте, что асинхронное представление возвращает тот же '
+            'ответ, что и синхронное.'
+        )
+        assert view.cls is TitleViewSet and view.csrf_exempt, (
+            'Проверьте, что асинхронное представление сохраняет атрибуты '
+            'вьюсета для метрик и CSRF.'
+        )
+
+    def test_02_async_middleware(self, async_client, settings):
+        settings.METRICS = True
+
+        async def get():
+            return await async_client.get(self.TITLES_URL)
+
+        response = async_to_sync(get)()
+        assert response.status_code == HTTPStatus.OK
+        _, responses, in_flight = registry.collect()
+        assert responses[('TitleViewSet.list', HTTPStatus.OK)], (
+            'Проверьте, что метрики собираются и под ASGI.'
+        )
+        assert in_flight['TitleViewSet.list'] == 0
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+
+from api.async_views import StreamingASGIHandler
+from tests.utils import create_comments, create_reviews
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+async def asgi_get(application, path, token):
+    communicator = ApplicationCommunicator(application, {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+    })
+    await communicator.send_input({'type': 'http.request'})
+    start = await communicator.receive_output(timeout=5)
+    body = b''
+    while True:
+        message = await communicator.receive_output(timeout=5)
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return start['status'], body.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Export:
+
+    REVIEWS_URL = '/api/v1/export/reviews/'
+    COMMENTS_URL = '/api/v1/export/comments/'
+
+    def test_01_admin_only(self, client, user_client):
+        for api_client in (client, user_client):
+            response = api_client.get(self.REVIEWS_URL)
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                f'Проверьте, что `{self.REVIEWS_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_02_reviews_jsonl(self, admin_client, admin, user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(self.REVIEWS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [
+            json.loads(line) for line in read_stream(response).splitlines()
+        ]
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews
+        ]
+        assert rows[0]['title'] == titles[0]['id']
+        assert rows[0]['author'] == admin.username
+        assert rows[0]['text'] == reviews[0]['text']
+        assert rows[0]['pub_date'], (
+            'Проверьте, что выгрузка отзывов содержит дату публикации.'
+        )
+
+        response = admin_client.get(
+            self.REVIEWS_URL, {'category': 'books'}
+        )
+        assert read_stream(response) == '', (
+            'Проверьте, что выгрузку можно отфильтровать по категории.'
+        )
+        response = admin_client.get(
+            self.REVIEWS_URL, {'pub_date_after': '2000-01-01',
+                               'title': titles[0]['id']}
+        )
+        assert len(read_stream(response).splitlines()) == len(reviews)
+
+    def test_03_comments_csv(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(self.COMMENTS_URL, {'format': 'csv'})
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'comments.csv' in response['Content-Disposition']
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert [int(row['id']) for row in rows] == [
+            comment['id'] for comment in comments
+        ]
+        assert rows[1]['author'] == user.username
+        assert int(rows[1]['review']) == reviews[0]['id']
+
+    def test_04_invalid_filter(self, admin_client):
+        response = admin_client.get(
+            self.REVIEWS_URL, {'pub_date_after': 'вчера'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный фильтр даты возвращает ошибку 400.'
+        )
+
+    def test_05_asgi_stream(self, admin_client, admin, user_client, user,
+                            token_admin):
+        reviews, _ = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        status, body = async_to_sync(asgi_get)(
+            StreamingASGIHandler(), self.REVIEWS_URL, token_admin['access']
+        )
+        assert status == HTTPStatus.OK
+        assert [json.loads(line)['id'] for line in body.splitlines()] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что под ASGI выгрузка читает записи из БД '
+            'не в цикле событий.'
+        )